@@ -5,8 +5,48 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test.db"
     OPENROUTER_API_KEY: str = ""
     OPENROUTER_MODEL: str = "deepseek/deepseek-chat"
+    OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1" # Point at a local stub for offline runs
     APP_URL: str = "http://localhost:8501"
     REQUEST_TIMEOUT: int = 120
+    LLM_CALL_TIMEOUT: float = 180 # Overall cap per LLM call, retries included
+    OPENROUTER_POOL_SIZE: int = 10 # Keep-alive connections per client
+    OPENROUTER_HTTP2: bool = True # Used only if the h2 package is installed
+    LLM_RATE_LIMIT_RPS: float = 2.0 # Requests per second to OpenRouter; 0 = unlimited
+    LLM_RATE_LIMIT_BURST: int = 5
+    LLM_MAX_CONCURRENCY: int = 4 # LLM calls in flight per process
+    LLM_QUEUE_TIMEOUT: float = 30 # Longest a call waits for admission before a 429
+    LLM_MAX_RETRIES: int = 3
+    LLM_BACKOFF_BASE: float = 1.0 # Seconds; doubled per retry, with full jitter
+    LLM_BACKOFF_MAX: float = 30 # Cap on the exponential backoff; a longer Retry-After is still honored
+    LLM_BREAKER_THRESHOLD: int = 5 # Consecutive upstream failures that open the circuit; 0 = off
+    LLM_BREAKER_COOLDOWN: float = 30 # Seconds the circuit stays open before a probe
+    LLM_PROMPT_TOKEN_BUDGET: int = 6000 # Est. tokens of resume + JD text per prompt
+    LLM_MODEL_TOKEN_BUDGETS: dict[str, int] = {} # Per-model overrides, e.g. {"deepseek/deepseek-chat": 12000}
+    LLM_JD_BUDGET_SHARE: float = 0.35 # Part of the budget a long JD may take
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL: int = 7 * 24 * 3600 # Seconds a cached completion stays valid
+    LLM_CACHE_MEMORY_ENTRIES: int = 512
+    LLM_CACHE_DISK_PATH: str = "./llm_cache.sqlite3" # Empty disables the on-disk tier
+    LLM_CACHE_DISK_ENTRIES: int = 20000
+    BLOB_STORE: str = "local" # Where original uploads are kept: local | s3
+    BLOB_STORE_PATH: str = "./blobs" # Root directory for the local store
+    BLOB_S3_BUCKET: str = ""
+    BLOB_S3_PREFIX: str = "resumes/"
+    BLOB_S3_ENDPOINT_URL: str = "" # S3-compatible endpoint (e.g. MinIO); empty = AWS
+    EXTRACTION_WORKERS: int = 2 # Document parsing processes; 0 = one per CPU core
+    EXTRACTION_MAX_BYTES: int = 20 * 1024 * 1024 # Largest accepted upload
+    EXTRACTION_MAX_PAGES: int = 100 # PDF pages parsed per file; 0 = no limit
+    EXTRACTION_TIMEOUT: float = 30 # Seconds before a parse is abandoned
+    BULK_UPLOAD_MAX_FILES: int = 500 # Documents per /resumes/bulk_upload request
+    CORPUS_MODEL_PATH: str = "./corpus_model.npz"
+    CORPUS_MODEL_SAVE_INTERVAL: float = 30 # Seconds between corpus model saves after uploads; 0 = every upload
+    RANKING_WORKERS: int = 0 # Scoring processes; 0 = one per CPU core
+    RANKING_PARALLEL_THRESHOLD: int = 20000 # Smaller pools are scored in-process
+    SCORING_WEIGHTS: dict[str, float] = {} # Deployment-wide weight profile over the defaults, e.g. {"experience": 0.25}
+    SKILL_INDEX_RESCAN_SECONDS: float = 300 # Re-read window for postings committed out of seq order; longer than any upload transaction
+    JOB_WORKERS: int = 2 # Background threads processing LLM jobs
+    LLM_BATCH_CONCURRENCY: int = 4 # Resumes rewritten at once per batch job
+    JOB_POLL_INTERVAL: float = 5.0 # Seconds between queue polls when idle
 
     class Config:
         env_file = ".env"
@@ -1,13 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import engine, Base
 from app.routes import jds, analysis, ranking, llm, resumes, reports
+from app.services import corpus_model, job_queue
 
 # Create Tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="AI Resume Checker & Optimizer")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume any queued/interrupted LLM jobs left from a previous run
+    job_queue.start_workers()
+    # Load the corpus model (or train it from the database if it has never
+    # been saved) before serving, not inside the first upload or ranking
+    corpus_model.get_model()
+    yield
+    # Uploads since the last debounced save
+    corpus_model.flush()
+
+app = FastAPI(title="AI Resume Checker & Optimizer", lifespan=lifespan)
 
 origins = ["*"]
 if settings.APP_URL and settings.APP_URL != "http://localhost:8501":
@@ -3,3 +3,6 @@ from .resume import Resume
 from .job_description import JobDescription
 from .analysis import ResumeAnalysis
 from .ranking import Ranking
+from .job import AnalysisJob
+from .score_cache import ScoreCache
+from .resume_skill import ResumeSkill
@@ -7,8 +7,9 @@ class ResumeAnalysis(Base):
     __tablename__ = "resume_analyses"
 
     id = Column(Integer, primary_key=True, index=True)
-    resume_id = Column(Integer, ForeignKey("resumes.id"))
-    jd_id = Column(Integer, ForeignKey("job_descriptions.id"))
+    resume_id = Column(Integer, ForeignKey("resumes.id"), index=True)
+    jd_id = Column(Integer, ForeignKey("job_descriptions.id"), index=True)
+    score_key = Column(String(64)) # Inputs this row was scored from (see services/score_cache.py)
     
     ats_score = Column(Float)
     skill_match_pct = Column(Float)
@@ -23,7 +24,7 @@ class ResumeAnalysis(Base):
     optimized_bullets = Column(JSON)
     generated_resume_text = Column(Text)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     resume = relationship("app.models.resume.Resume")
     job_description = relationship("app.models.job_description.JobDescription")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, index=True) # Handler name, see services/job_queue.py
+    status = Column(String, index=True, default="queued") # queued | running | done | failed
+    analysis_id = Column(Integer, ForeignKey("resume_analyses.id"), nullable=True)
+    
+    payload = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    analysis = relationship("app.models.analysis.ResumeAnalysis")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary, JSON
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -8,4 +8,8 @@ class JobDescription(Base):
     id = Column(Integer, primary_key=True, index=True)
     role = Column(String, index=True)
     jd_text = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    term_vector = Column(LargeBinary) # Cached hashed term counts (see services/corpus_model.py)
+    features = Column(JSON) # Cached skills/years/education (see services/feature_store.py)
+    features_version = Column(String)
+    scoring_weights = Column(JSON) # Per-JD weight profile over the defaults (see services/scoring.py)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
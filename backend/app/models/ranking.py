@@ -1,16 +1,26 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Ranking(Base):
     __tablename__ = "rankings"
+    __table_args__ = (
+        # One row per candidate per JD; target of the bulk upsert in services/ranking_store.py
+        UniqueConstraint("jd_id", "resume_id", name="uq_rankings_jd_resume"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     jd_id = Column(Integer, ForeignKey("job_descriptions.id"))
     resume_id = Column(Integer, ForeignKey("resumes.id"))
     score = Column(Float)
     rank_position = Column(Integer)
+
+    # Sub-scores the final score was weighted from, for re-ranking with new weights
+    skill_match = Column(Float)
+    similarity = Column(Float)
+    experience = Column(Float)
+    education = Column(Float)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     job_description = relationship("app.models.job_description.JobDescription")
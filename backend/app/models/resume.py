@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, LargeBinary, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -9,8 +9,13 @@ class Resume(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     filename = Column(String)
-    file_path = Column(String)
+    file_path = Column(String) # Blob store URI of the original file; "memory" for older rows
     resume_text = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    content_hash = Column(String(64), index=True) # sha256 of the uploaded bytes = blob store key (see services/blob_store.py)
+    text_hash = Column(String(64), index=True) # sha256 of the normalized extracted text
+    term_vector = Column(LargeBinary) # Cached hashed term counts (see services/corpus_model.py)
+    features = Column(JSON) # Cached skills/years/education (see services/feature_store.py)
+    features_version = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     user = relationship("app.models.user.User")
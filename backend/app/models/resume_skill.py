@@ -0,0 +1,58 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, delete, event, insert, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.resume import Resume
+
+# Posting written for a resume whose features hold no skills, so an
+# update that removes every skill still leaves a row the index can see
+NO_SKILLS = ""
+
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+    __table_args__ = (
+        # Each skill's posting list is one ordered index range (see services/skill_index.py)
+        UniqueConstraint("skill", "resume_id", name="uq_resume_skills_skill_resume"),
+        # seq must never be reused after deletes (SQLite's default rowid would be)
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True) # Insert order; the in-memory index catches up from it
+    skill = Column(String, nullable=False)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+def posting_rows(resume_id: int, features: dict) -> list[dict]:
+    """resume_skills rows for a resume's cached features."""
+    skills = set(features["skills"]) or {NO_SKILLS}
+    return [{"skill": skill, "resume_id": resume_id} for skill in sorted(skills)]
+
+@event.listens_for(Session, "after_flush")
+def _refresh_postings(session: Session, flush_context):
+    """
+    Rewrites a resume's postings in the same transaction whenever a flush
+    changes its skills: upload, lazy re-extraction after a FEATURES_VERSION
+    bump, text reprocessing, ranking. Feature updates that keep the same
+    skills leave the postings alone.
+    """
+    replaced = []
+    rows = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Resume):
+            continue
+        history = inspect(obj).attrs.features.history
+        if not history.has_changes() or obj.features is None:
+            continue
+        old = history.deleted[0] if history.deleted else None
+        if old is not None and set(old["skills"]) == set(obj.features["skills"]):
+            continue
+        if obj not in session.new:
+            replaced.append(obj.id)
+        rows.extend(posting_rows(obj.id, obj.features))
+
+    # Core statements on the connection: ORM ones would re-enter the flush
+    connection = session.connection()
+    if replaced:
+        connection.execute(delete(ResumeSkill.__table__).where(ResumeSkill.resume_id.in_(replaced)))
+    if rows:
+        connection.execute(insert(ResumeSkill.__table__), rows)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ScoreCache(Base):
+    __tablename__ = "score_cache"
+    __table_args__ = (
+        # One row per candidate per JD; rewritten when its cache_key changes (see services/score_cache.py)
+        UniqueConstraint("jd_id", "resume_id", name="uq_score_cache_jd_resume"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    jd_id = Column(Integer, ForeignKey("job_descriptions.id"))
+    resume_id = Column(Integer, ForeignKey("resumes.id"))
+    cache_key = Column(String(64)) # Hash of both texts, features version and scorers version
+    scores = Column(JSON) # Sub-score per registered scorer (see services/scoring.py)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 from app.database import get_db
 from app.models.resume import Resume
 from app.models.job_description import JobDescription
 from app.models.analysis import ResumeAnalysis
-from app.schemas.analysis import AnalysisRequest, AnalysisResponse
-from app.utils.skills import extract_skills
-from app.services import ats_engine
-import json
+from app.models.job import AnalysisJob
+from app.schemas.analysis import AnalysisRequest, AnalysisResponse, AnalysisJobResponse, AnalysisSummary
+from app.services import corpus_model, feature_store, job_queue, pagination, score_cache, scoring
+from app.services import analysis_llm  # noqa: F401  (registers the "analysis_llm" job handler)
 
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
@@ -21,24 +22,49 @@ def run_analysis(request: AnalysisRequest, db: Session = Depends(get_db)):
     jd = db.query(JobDescription).filter(JobDescription.id == request.jd_id).first()
     if not jd:
         raise HTTPException(status_code=404, detail="Job Description not found")
-        
-    # 2. Extract Skills
-    resume_skills = extract_skills(resume.resume_text or "")
-    jd_skills = extract_skills(jd.jd_text or "")
-    
-    # 3. Compute Scores
-    skill_match_score = ats_engine.compute_skill_match(resume_skills, jd_skills)
-    similarity_score = ats_engine.compute_similarity_score(resume.resume_text or "", jd.jd_text or "")
     
-    resume_exp = ats_engine.extract_years_of_experience(resume.resume_text or "")
-    jd_exp = ats_engine.extract_years_of_experience(jd.jd_text or "")
-    exp_score = ats_engine.compute_experience_score(resume_exp, jd_exp)
+    # Same scoring pipeline (and JD weight profile) as ranking
+    pipeline = scoring.get_pipeline(jd.scoring_weights)
     
-    edu_score = ats_engine.compute_education_score(resume.resume_text or "", jd.jd_text or "")
+    # Neither document nor the scoring config changed since the last run:
+    # reuse that analysis instead of scoring and storing it again
+    score_key = score_cache.score_key(score_cache.resume_hash(resume), score_cache.jd_hash(jd), pipeline.version)
+    analysis = (
+        db.query(ResumeAnalysis)
+        .filter(
+            ResumeAnalysis.resume_id == resume.id,
+            ResumeAnalysis.jd_id == jd.id,
+            ResumeAnalysis.score_key == score_key
+        )
+        .order_by(ResumeAnalysis.id.desc())
+        .first()
+    )
+    if analysis is not None:
+        return _respond(db, analysis, request.use_llm)
+        
+    # 2. Load Cached Features (re-extracted only if missing or stale)
+    resume_features = feature_store.get_features(resume, resume.resume_text)
+    jd_features = feature_store.get_features(jd, jd.jd_text)
+    resume_skills = resume_features["skills"]
+    jd_skills = jd_features["skills"]
     
-    final_score = ats_engine.compute_final_ats_score(
-        skill_match_score, similarity_score, exp_score, edu_score
+    # 3. Compute Scores (a batch of one)
+    similarity_scores = corpus_model.get_model().similarities(
+        corpus_model.document_vectors([resume], [resume.resume_text]),
+        corpus_model.document_vectors([jd], [jd.jd_text])
     )
+    scores = {
+        name: float(values[0])
+        for name, values in pipeline.score(jd_features, [resume_features], similarity_scores).items()
+    }
+    skill_match_score = scores["skill_match"]
+    similarity_score = scores["similarity"]
+    exp_score = scores["experience"]
+    edu_score = scores["education"]
+    final_score = scores["final"]
+    
+    resume_exp = resume_features["years_exp"]
+    jd_exp = jd_features["years_exp"]
     
     # 4. Detailed Analysis
     resume_skills_set = set(s.lower() for s in resume_skills)
@@ -59,49 +85,11 @@ def run_analysis(request: AnalysisRequest, db: Session = Depends(get_db)):
     if exp_score < 100:
         recommendations.append(f"Experience gap detected. JD mentions {jd_exp} years, found {resume_exp} years.")
         
-    # LLM Augmentation
-    optimized_bullets = None
-    generated_resume_text = None
-    
-    if request.use_llm:
-        from app.services import openrouter_client, prompt_templates
-        import json
-        
-        # 4a. Rewrite Bullets
-        try:
-            bullet_prompts = prompt_templates.build_rewrite_bullets_prompt(
-                resume.resume_text or "",
-                jd.jd_text or "",
-                missing_skills,
-                jd.role or "Target Role"
-            )
-            bullets_resp = openrouter_client.call_openrouter(bullet_prompts)
-            try:
-                optimized_bullets = json.loads(bullets_resp)["rewritten_bullets"]
-            except:
-                # Fallback if valid JSON not found in mocked/raw response
-                # We interpret the raw string as a single item or handle error
-                pass
-        except Exception as e:
-            print(f"LLM Error (Bullets): {e}")
-
-        # 4b. Generate Full Optimized Resume
-        try:
-            resume_prompts = prompt_templates.build_full_resume_prompt(
-                resume.resume_text or "",
-                jd.jd_text or "",
-                jd.role or "Target Role",
-                resume.user.name if resume.user else "Candidate"
-            )
-            resume_resp = openrouter_client.call_openrouter(resume_prompts)
-            generated_resume_text = resume_resp # Keep raw string or JSON string
-        except Exception as e:
-            print(f"LLM Error (Resume): {e}")
-
     # 5. Store Result
     analysis = ResumeAnalysis(
         resume_id=resume.id,
         jd_id=jd.id,
+        score_key=score_key,
         ats_score=final_score,
         skill_match_pct=skill_match_score,
         similarity_score_pct=similarity_score,
@@ -110,13 +98,53 @@ def run_analysis(request: AnalysisRequest, db: Session = Depends(get_db)):
         matched_skills=matched_skills,
         missing_skills=missing_skills,
         keyword_suggestions=keyword_suggestions,
-        recommendations=recommendations,
-        optimized_bullets=optimized_bullets,
-        generated_resume_text=generated_resume_text
+        recommendations=recommendations
     )
     
     db.add(analysis)
     db.commit()
     db.refresh(analysis)
     
+    return _respond(db, analysis, request.use_llm)
+
+def _respond(db: Session, analysis: ResumeAnalysis, use_llm: bool):
+    # 6. LLM Augmentation runs in the background; the client polls the job.
+    # A cached analysis reuses its pending or finished job instead of
+    # paying for the same LLM calls again.
+    if use_llm:
+        job = job_queue.enqueue_once(db, "analysis_llm", analysis.id)
+        return AnalysisResponse.model_validate(analysis).model_copy(
+            update={"job_id": job.id, "llm_status": job.status}
+        )
+    
     return analysis
+
+@router.get("/", response_model=List[AnalysisSummary])
+def list_analyses(
+    response: Response,
+    resume_id: Optional[int] = None,
+    jd_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Newest analyses first, optionally for one resume and/or JD. Keyset-
+    paginated like GET /resumes/; only the summary columns are loaded.
+    """
+    query = db.query(ResumeAnalysis).options(load_only(
+        ResumeAnalysis.id, ResumeAnalysis.resume_id, ResumeAnalysis.jd_id,
+        ResumeAnalysis.ats_score, ResumeAnalysis.created_at
+    ))
+    if resume_id is not None:
+        query = query.filter(ResumeAnalysis.resume_id == resume_id)
+    if jd_id is not None:
+        query = query.filter(ResumeAnalysis.jd_id == jd_id)
+    return pagination.keyset_page(query, ResumeAnalysis.id, limit, after_id, response)
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+def get_analysis_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,22 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 from app.database import get_db
 from app.models.job_description import JobDescription
-from app.schemas.job_description import JDCreate, JDResponse
+from app.schemas.job_description import JDCreate, JDResponse, JDSummary, ScoringWeights
+from app.services import corpus_model, feature_store, pagination, scoring
 
 router = APIRouter(prefix="/jds", tags=["Job Descriptions"])
 
+def _validate_weights(weights: dict) -> dict:
+    try:
+        return scoring.resolve_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/create", response_model=dict)
 def create_jd(jd: JDCreate, db: Session = Depends(get_db)):
-    db_jd = JobDescription(role=jd.role, jd_text=jd.jd_text)
+    if jd.scoring_weights:
+        _validate_weights(jd.scoring_weights)
+    db_jd = JobDescription(role=jd.role, jd_text=jd.jd_text, scoring_weights=jd.scoring_weights or None)
+    corpus_model.index_documents([db_jd], [jd.jd_text])
+    feature_store.get_features(db_jd, jd.jd_text)
     db.add(db_jd)
     db.commit()
     db.refresh(db_jd)
     return {"jd_id": db_jd.id}
 
+@router.get("/", response_model=List[JDSummary])
+def list_jds(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Newest JDs first, keyset-paginated like GET /resumes/ (no jd_text)."""
+    query = db.query(JobDescription).options(
+        load_only(JobDescription.id, JobDescription.role, JobDescription.created_at)
+    )
+    return pagination.keyset_page(query, JobDescription.id, limit, after_id, response)
+
 @router.get("/{jd_id}", response_model=JDResponse)
 def get_jd(jd_id: int, db: Session = Depends(get_db)):
     db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
     if not db_jd:
         raise HTTPException(status_code=404, detail="Job Description not found")
     return db_jd
+
+@router.get("/{jd_id}/weights", response_model=ScoringWeights)
+def get_jd_weights(jd_id: int, db: Session = Depends(get_db)):
+    """Effective weight of every registered scorer for this JD."""
+    db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if not db_jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    return ScoringWeights(weights=scoring.resolve_weights(db_jd.scoring_weights))
+
+@router.put("/{jd_id}/weights", response_model=ScoringWeights)
+def set_jd_weights(jd_id: int, body: ScoringWeights, db: Session = Depends(get_db)):
+    """
+    Replaces the JD's weight profile (scorer name -> weight; unnamed
+    scorers keep the defaults). Analyses and rankings pick it up on their
+    next run without re-extracting features; cached sub-scores are reused.
+    """
+    db_jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if not db_jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    weights = _validate_weights(body.weights)
+    db_jd.scoring_weights = body.weights or None
+    db.commit()
+    return ScoringWeights(weights=weights)
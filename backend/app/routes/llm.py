@@ -1,18 +1,29 @@
-from fastapi import APIRouter, HTTPException, Body
-from app.schemas.llm import RewriteBulletsRequest, GenerateSummaryRequest, GenerateResumeRequest
-from app.services import openrouter_client, prompt_templates
+from fastapi import APIRouter, Depends, HTTPException, Body, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.job_description import JobDescription
+from app.schemas.llm import RewriteBulletsRequest, GenerateSummaryRequest, GenerateResumeRequest, BatchRewriteRequest
+from app.schemas.analysis import AnalysisJobResponse
+from app.services import openrouter_client, prompt_templates, llm_cache, llm_governor, prompt_budget, job_queue
+from app.services import batch_rewrite  # noqa: F401  (registers the "batch_rewrite" job handler)
 import json
 
 router = APIRouter(prefix="/llm", tags=["LLM Tools"])
 
+# Response header reporting how many (estimated) prompt tokens budgeting saved
+TOKENS_SAVED_HEADER = "X-Prompt-Tokens-Saved"
+
 @router.post("/rewrite_bullets")
-def rewrite_bullets(request: RewriteBulletsRequest):
+def rewrite_bullets(request: RewriteBulletsRequest, response: Response):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text, request.missing_skills)
     prompts = prompt_templates.build_rewrite_bullets_prompt(
-        request.resume_text, 
-        request.jd_text, 
+        fitted["resume_text"], 
+        fitted["jd_text"], 
         request.missing_skills, 
         request.target_role
     )
+    response.headers[TOKENS_SAVED_HEADER] = str(fitted["tokens_saved"])
     response_text = openrouter_client.call_openrouter(prompts)
     try:
         # Attempt to parse as JSON if the prompt requested JSON
@@ -21,12 +32,14 @@ def rewrite_bullets(request: RewriteBulletsRequest):
         return {"content": response_text}
 
 @router.post("/generate_summary")
-def generate_summary(request: GenerateSummaryRequest):
+def generate_summary(request: GenerateSummaryRequest, response: Response):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text)
     prompts = prompt_templates.build_summary_prompt(
-        request.resume_text, 
-        request.jd_text, 
+        fitted["resume_text"], 
+        fitted["jd_text"], 
         request.target_role
     )
+    response.headers[TOKENS_SAVED_HEADER] = str(fitted["tokens_saved"])
     response_text = openrouter_client.call_openrouter(prompts)
     try:
         return json.loads(response_text)
@@ -34,15 +47,94 @@ def generate_summary(request: GenerateSummaryRequest):
         return {"summary": response_text}
 
 @router.post("/generate_resume")
-def generate_resume(request: GenerateResumeRequest):
+def generate_resume(request: GenerateResumeRequest, response: Response):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text)
     prompts = prompt_templates.build_full_resume_prompt(
-        request.resume_text, 
-        request.jd_text, 
+        fitted["resume_text"], 
+        fitted["jd_text"], 
         request.target_role,
         request.candidate_name
     )
+    response.headers[TOKENS_SAVED_HEADER] = str(fitted["tokens_saved"])
     response_text = openrouter_client.call_openrouter(prompts)
     try:
         return json.loads(response_text)
     except:
         return {"content": response_text}
+
+# Streaming variants: same prompts, but the completion is relayed as plain
+# text chunks while the model generates it instead of one JSON body.
+
+@router.post("/rewrite_bullets/stream")
+def rewrite_bullets_stream(request: RewriteBulletsRequest):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text, request.missing_skills)
+    prompts = prompt_templates.build_rewrite_bullets_prompt(
+        fitted["resume_text"], 
+        fitted["jd_text"], 
+        request.missing_skills, 
+        request.target_role
+    )
+    return StreamingResponse(
+        openrouter_client.stream_openrouter(prompts),
+        media_type="text/plain",
+        headers={TOKENS_SAVED_HEADER: str(fitted["tokens_saved"])}
+    )
+
+@router.post("/generate_summary/stream")
+def generate_summary_stream(request: GenerateSummaryRequest):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text)
+    prompts = prompt_templates.build_summary_prompt(
+        fitted["resume_text"], 
+        fitted["jd_text"], 
+        request.target_role
+    )
+    return StreamingResponse(
+        openrouter_client.stream_openrouter(prompts),
+        media_type="text/plain",
+        headers={TOKENS_SAVED_HEADER: str(fitted["tokens_saved"])}
+    )
+
+@router.post("/generate_resume/stream")
+def generate_resume_stream(request: GenerateResumeRequest):
+    fitted = prompt_budget.fit_inputs(request.resume_text, request.jd_text)
+    prompts = prompt_templates.build_full_resume_prompt(
+        fitted["resume_text"], 
+        fitted["jd_text"], 
+        request.target_role,
+        request.candidate_name
+    )
+    return StreamingResponse(
+        openrouter_client.stream_openrouter(prompts),
+        media_type="text/plain",
+        headers={TOKENS_SAVED_HEADER: str(fitted["tokens_saved"])}
+    )
+
+@router.post("/batch_rewrite", response_model=AnalysisJobResponse)
+def batch_rewrite_bullets(request: BatchRewriteRequest, db: Session = Depends(get_db)):
+    """
+    Queues optimized-bullet generation for many resumes against one JD.
+    Poll GET /analysis/jobs/{id}: the job result fills in per resume as
+    each one completes.
+    """
+    jd = db.query(JobDescription).filter(JobDescription.id == request.jd_id).first()
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    if not request.resume_ids:
+        raise HTTPException(status_code=400, detail="No resume ids given")
+
+    return job_queue.enqueue(db, "batch_rewrite", payload=request.model_dump())
+
+@router.get("/cache/stats")
+def cache_stats():
+    cache = llm_cache.get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.get_stats()}
+
+@router.get("/metrics")
+def governor_metrics():
+    """
+    Admission metrics for OpenRouter traffic (queue wait, rejections,
+    retries, circuit state) and prompt budgeting totals.
+    """
+    return {**llm_governor.get_governor().get_metrics(), "prompt_budget": prompt_budget.get_stats()}
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, load_only
+from typing import Dict, List, Optional
+from datetime import datetime
+from app.database import get_db, SessionLocal
 from app.models.resume import Resume
 from app.models.job_description import JobDescription
-from app.models.ranking import Ranking
-from app.services import ranking_engine
+from app.services import ranking_engine, ranking_store, scoring
+import numpy as np
+import json
 
 router = APIRouter(prefix="/rank", tags=["Ranking"])
 
@@ -13,49 +16,140 @@ router = APIRouter(prefix="/rank", tags=["Ranking"])
 def rank_candidates(
     jd_id: int, 
     resume_ids: List[int] = Body(embed=True), 
+    top_k: Optional[int] = Body(None, embed=True),
+    weights: Optional[Dict[str, float]] = Body(None, embed=True),
     db: Session = Depends(get_db)
 ):
+    """
+    Ranks the given resumes against a JD. weights (scorer name -> weight)
+    override the JD's profile for this request only; unchanged candidates
+    are re-ranked from cached sub-scores without re-scoring.
+    """
     # 1. Fetch JD
     jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
     if not jd:
         raise HTTPException(status_code=404, detail="Job Description not found")
         
-    # 2. Fetch Resumes
-    resumes = db.query(Resume).filter(Resume.id.in_(resume_ids)).all()
+    # 2. Fetch Resumes (text, vectors and features are only loaded for
+    # score cache misses and the candidates returned)
+    resumes = (
+        db.query(Resume)
+        .options(load_only(Resume.id, Resume.filename, Resume.text_hash, Resume.features_version))
+        .filter(Resume.id.in_(resume_ids))
+        .all()
+    )
     if not resumes:
         raise HTTPException(status_code=404, detail="No resumes found")
         
-    # 3. Run Ranking Engine
-    results = ranking_engine.rank_resumes(jd, resumes)
+    # 3. Run Ranking Engine (unchanged candidates come from the score cache)
+    try:
+        scores = ranking_engine.score_resumes(jd, resumes, db=db, weights=weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    order = ranking_engine.top_k_indices(scores["final"])
     
-    # 4. Save to DB (Upsert logic or cleaner replace)
-    # Ideally checking if ranking exists and updating, or creating new.
-    # For simplicity, we'll create new records. In prod, use ON CONFLICT DO UPDATE.
+    # 4. Replace the JD's stored ranking with every candidate's position and
+    # sub-scores, so /reweight re-ranks exactly this pool
+    columns = {c: scores[c][order].tolist() for c in ranking_store.SCORE_COLUMNS}
+    ranking_store.replace_rankings(db, jd.id, [
+        {
+            "resume_id": resumes[i].id,
+            "ats_score": final,
+            "rank_position": position,
+            "scores": {c: columns[c][position - 1] for c in ranking_store.SCORE_COLUMNS}
+        }
+        for position, (i, final) in enumerate(zip(order.tolist(), scores["final"][order].tolist()), start=1)
+    ])
     
-    # Clear old rankings for this JD/Resume combo if needed? 
-    # Let's just append for history or update if we implement unique constraints.
-    # Assuming user wants latest snapshot.
-    
-    saved_rankings = []
-    for res in results:
-        # Check if exists
-        existing = db.query(Ranking).filter(
-            Ranking.jd_id == jd.id, 
-            Ranking.resume_id == res["resume_id"]
-        ).first()
-        
-        if existing:
-            existing.score = res["ats_score"]
-            existing.rank_position = res["rank_position"]
-        else:
-            new_ranking = Ranking(
-                jd_id=jd.id,
-                resume_id=res["resume_id"],
-                score=res["ats_score"],
-                rank_position=res["rank_position"]
-            )
-            db.add(new_ranking)
-            
+    # Skill breakdowns are only built for the candidates actually returned
+    top = order if top_k is None else order[:max(top_k, 0)]
+    results = ranking_engine.ranked_results(jd, resumes, scores, top, db)
     db.commit()
     
     return results
+
+@router.post("/jd/{jd_id}/reweight")
+def reweight_ranking(
+    jd_id: int,
+    weights: Dict[str, float] = Body(embed=True),
+    top_k: Optional[int] = Body(50, embed=True),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-ranks the candidates of the last POST /rank/jd/{jd_id} (each POST
+    replaces the JD's stored ranking) with new weights, layered over the
+    JD's profile, purely from the stored sub-score columns: one query and
+    one vectorized weighted sum, no feature extraction or scoring. Nothing is persisted; PUT
+    /jds/{jd_id}/weights to keep a profile.
+    """
+    jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+    try:
+        pipeline = scoring.get_pipeline(ranking_engine.jd_weights(jd, weights))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    unstored = [name for name, weight in pipeline.weights.items() if weight and name not in ranking_store.SCORE_COLUMNS]
+    if unstored:
+        raise HTTPException(status_code=400, detail=f"Sub-scores not stored on rankings: {', '.join(unstored)}")
+    
+    resume_ids, columns = ranking_store.load_score_columns(db, jd_id)
+    if len(resume_ids) == 0:
+        raise HTTPException(status_code=404, detail="No stored ranking for this JD; rank candidates first")
+    
+    zeros = np.zeros(len(resume_ids))
+    final_scores = pipeline.combine({name: columns.get(name, zeros) for name in scoring.SCORERS})
+    top = ranking_engine.top_k_indices(final_scores, top_k)
+    
+    top_ids = resume_ids[top].tolist()
+    filenames = dict(db.query(Resume.id, Resume.filename).filter(Resume.id.in_(top_ids)).all())
+    return [
+        {
+            "resume_id": resume_id,
+            "filename": filenames.get(resume_id),
+            "ats_score": float(final_scores[i]),
+            "scores": {c: float(columns[c][i]) for c in ranking_store.SCORE_COLUMNS},
+            "rank_position": position
+        }
+        for position, (resume_id, i) in enumerate(zip(top_ids, top.tolist()), start=1)
+    ]
+
+@router.get("/jd/{jd_id}/stream")
+def rank_pool_stream(
+    jd_id: int,
+    top_k: int = Query(50, ge=1, le=1000),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Ranks the whole stored resume pool (optionally filtered by upload date
+    or user) against a JD and streams NDJSON: progress events while chunks
+    are scored, then the top_k results.
+    """
+    jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+    if not jd:
+        raise HTTPException(status_code=404, detail="Job Description not found")
+
+    def ndjson_lines():
+        # The stream outlives the request-scoped session, so it gets its own
+        stream_db = SessionLocal()
+        try:
+            stream_jd = stream_db.get(JobDescription, jd_id)
+            for event in ranking_engine.stream_rank_pool(
+                stream_db, stream_jd,
+                top_k=top_k,
+                chunk_size=chunk_size,
+                created_after=created_after,
+                created_before=created_before,
+                user_id=user_id
+            ):
+                yield json.dumps(event) + "\n"
+            stream_db.commit() # JD features refreshed if stale
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
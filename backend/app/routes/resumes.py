@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
+from app.config import settings
 from app.database import get_db
 from app.models.resume import Resume
+from app.models.job_description import JobDescription
+from app.services import corpus_model, feature_store, text_extraction, dedupe, pagination, skill_index
+from app.services.blob_store import get_blob_store, BlobTooLargeError
 from pydantic import BaseModel
-import PyPDF2
-import docx
-import io
+from typing import BinaryIO
+import asyncio
+import os
+import zipfile
 
 router = APIRouter(prefix="/resumes", tags=["Resumes"])
 
@@ -13,58 +20,317 @@ class ResumeResponse(BaseModel):
     id: int
     filename: str
     created_at: str
+    duplicate: bool = False # True if an identical resume was already stored
     
     class Config:
         from_attributes = True
 
+class SkillSearchResult(BaseModel):
+    resume_id: int
+    filename: Optional[str] = None
+    score: float # Share of the scored skills the resume has, 0-100
+    matched_skills: List[str]
+
+class SkillSearchResponse(BaseModel):
+    query: str # The query as parsed, with skill names resolved
+    total: int # Resumes matching the query, before top_k
+    results: List[SkillSearchResult]
+
+class BulkUploadItem(BaseModel):
+    filename: str
+    status: str # created | duplicate | failed
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+def _put_blob(source: BinaryIO) -> tuple[Optional[str], Optional[str]]:
+    """
+    Streams an upload into the blob store (never whole in memory).
+    Returns (key, error); the key is the sha256 of the file's bytes.
+    """
+    try:
+        key, _ = get_blob_store().put_file(source, settings.EXTRACTION_MAX_BYTES)
+        return key, None
+    except BlobTooLargeError as e:
+        return None, str(e)
+
+def _open_zip(file: UploadFile) -> tuple[Optional[zipfile.ZipFile], list[zipfile.ZipInfo]]:
+    """
+    Opens an uploaded zip archive and lists the documents in it from the
+    central directory, without reading any member yet. Directories,
+    hidden files and macOS metadata are skipped. (None, []) if the upload
+    is not a valid zip.
+    """
+    try:
+        archive = zipfile.ZipFile(file.file)
+    except zipfile.BadZipFile:
+        return None, []
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and os.path.basename(info.filename)
+        and not os.path.basename(info.filename).startswith(".")
+        and not info.filename.startswith("__MACOSX/")
+    ]
+    return archive, members
+
+def _unpack_zip(archive: zipfile.ZipFile, members: list[zipfile.ZipInfo]) -> list[tuple[str, Optional[str], Optional[str]]]:
+    """
+    (member name, blob key, error) for each listed member, streamed member
+    by member into the blob store.
+    """
+    entries = []
+    with archive:
+        for info in members:
+            with archive.open(info) as member:
+                entries.append((os.path.basename(info.filename), *_put_blob(member)))
+    return entries
+
+def _discard_unreferenced_blobs(db: Session, keys: list[Optional[str]]):
+    """
+    Deletes uploaded blobs that no resume row points to: files that failed
+    to parse, or whose text matched a resume stored from other bytes.
+    """
+    keys = {key for key in keys if key}
+    if not keys:
+        return
+    referenced = dedupe.find_by_content_hashes(db, keys)
+    store = get_blob_store()
+    for key in keys - referenced.keys():
+        store.delete(key)
+
+def _store_resumes(db: Session, parsed: list[tuple[str, str, str]]) -> list[tuple[Resume, bool]]:
+    """
+    Stores parsed (filename, text, content_hash) documents in one
+    transaction and one corpus model update; content_hash is also the key
+    of the original file in the blob store. A document whose normalized
+    text matches a stored resume, or an earlier one in the same call, is
+    not stored again. Returns (resume, duplicate) per document.
+    """
+    text_hashes = [dedupe.text_hash(text_content) for _, text_content, _ in parsed]
+    existing = dedupe.find_by_text_hashes(db, text_hashes)
+
+    outcomes = []
+    new_resumes = []
+    for (filename, text_content, c_hash), t_hash in zip(parsed, text_hashes):
+        match = existing.get(t_hash)
+        if match is not None:
+            if match.content_hash is None or match.file_path == "memory":
+                # A row from before files were kept: adopt this file
+                match.content_hash = c_hash
+                match.file_path = get_blob_store().uri(c_hash)
+            outcomes.append((match, True))
+            continue
+        db_resume = Resume(
+            filename=filename,
+            file_path=get_blob_store().uri(c_hash),
+            resume_text=text_content,
+            content_hash=c_hash,
+            text_hash=t_hash
+        )
+        if t_hash:
+            existing[t_hash] = db_resume
+        new_resumes.append(db_resume)
+        outcomes.append((db_resume, False))
+
+    if new_resumes:
+        corpus_model.index_documents(new_resumes, [r.resume_text for r in new_resumes])
+        for db_resume in new_resumes:
+            feature_store.get_features(db_resume, db_resume.resume_text)
+        db.add_all(new_resumes) # skill postings are written on flush (see models/resume_skill.py)
+    db.commit()
+    return outcomes
+
+def _response(db_resume: Resume, duplicate: bool) -> ResumeResponse:
+    return ResumeResponse(
+        id=db_resume.id, 
+        filename=db_resume.filename, 
+        created_at=str(db_resume.created_at),
+        duplicate=duplicate
+    )
+
 @router.post("/upload", response_model=ResumeResponse)
 async def upload_resume(
     file: UploadFile = File(...), 
     db: Session = Depends(get_db)
 ):
-    content = await file.read()
     filename = file.filename
-    text_content = ""
     
-    # Simple extraction logic
-    try:
-        if filename.endswith(".pdf"):
-            reader = PyPDF2.PdfReader(io.BytesIO(content))
-            for page in reader.pages:
-                text_content += page.extract_text() + "\n"
-        elif filename.endswith(".docx"):
-            doc = docx.Document(io.BytesIO(content))
-            for para in doc.paragraphs:
-                text_content += para.text + "\n"
-        else:
-            # Assume text or ignore
-            text_content = content.decode("utf-8", errors="ignore")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
+    # The original file is kept in the blob store, keyed by its hash
+    c_hash, error = await run_in_threadpool(_put_blob, file.file)
+    if error:
+        raise HTTPException(status_code=413, detail=error)
     
-    # Clean text
-    text_content = text_content.strip()
+    # A byte-identical file was already stored: reuse it without parsing
+    existing = await run_in_threadpool(dedupe.find_by_content_hashes, db, [c_hash])
+    if c_hash in existing:
+        return _response(existing[c_hash], duplicate=True)
     
-    db_resume = Resume(
-        filename=filename,
-        file_path="memory", # Not saving to disk for now
-        resume_text=text_content
-    )
-    db.add(db_resume)
-    db.commit()
-    db.refresh(db_resume)
+    # Parsing runs in the extraction process pool, off the event loop
+    try:
+        text_content = await text_extraction.extract_text_async(filename, c_hash)
+    except HTTPException:
+        await run_in_threadpool(_discard_unreferenced_blobs, db, [c_hash])
+        raise
     
-    return ResumeResponse(
-        id=db_resume.id, 
-        filename=db_resume.filename, 
-        created_at=str(db_resume.created_at)
-    )
+    # Indexing and the DB write are blocking too, so they go to a thread
+    [(db_resume, duplicate)] = await run_in_threadpool(_store_resumes, db, [(filename, text_content, c_hash)])
+    if duplicate:
+        await run_in_threadpool(_discard_unreferenced_blobs, db, [c_hash])
+    
+    return _response(db_resume, duplicate)
+
+@router.post("/bulk_upload", response_model=List[BulkUploadItem])
+async def bulk_upload_resumes(
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Uploads many resumes at once, as separate files and/or zip archives.
+    Documents already stored (same bytes, or same normalized text) are
+    reported as duplicates with the existing id instead of being stored
+    again. The rest are parsed in parallel in the extraction pool and
+    inserted in a single transaction. Returns a status per document, in
+    upload order; one bad file does not fail the batch.
+    """
+    # Count documents (zip members from each central directory) before
+    # anything is written to the blob store
+    archives = {} # index in files -> (archive, members)
+    n_documents = 0
+    for i, file in enumerate(files):
+        if file.filename.lower().endswith(".zip"):
+            archive, members = await run_in_threadpool(_open_zip, file)
+            if archive is not None:
+                archives[i] = (archive, members)
+                n_documents += len(members)
+                continue
+        n_documents += 1
+
+    if n_documents > settings.BULK_UPLOAD_MAX_FILES:
+        for archive, _ in archives.values():
+            archive.close()
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files ({n_documents}); the limit is {settings.BULK_UPLOAD_MAX_FILES} per request"
+        )
+
+    documents = [] # (filename, blob key, error)
+    for i, file in enumerate(files):
+        if i in archives:
+            documents.extend(await run_in_threadpool(_unpack_zip, *archives[i]))
+        elif file.filename.lower().endswith(".zip"):
+            documents.append((file.filename, None, "Not a valid zip archive"))
+        else:
+            documents.append((file.filename, *await run_in_threadpool(_put_blob, file.file)))
+
+    c_hashes = [key for _, key, _ in documents]
+    existing = await run_in_threadpool(dedupe.find_by_content_hashes, db, c_hashes)
+
+    results = [BulkUploadItem(filename=filename, status="failed", error=error) for filename, _, error in documents]
+    first_with_hash = {} # content hash -> index of the first document carrying it
+    to_parse = []
+    for i, (filename, _, error) in enumerate(documents):
+        if error:
+            continue
+        if c_hashes[i] in existing:
+            results[i].status, results[i].id = "duplicate", existing[c_hashes[i]].id
+        elif c_hashes[i] in first_with_hash:
+            results[i].status = "duplicate" # id filled in once the first copy is stored
+        else:
+            first_with_hash[c_hashes[i]] = i
+            to_parse.append(i)
+
+    async def parse(i: int) -> tuple[Optional[str], Optional[str]]:
+        filename, key, _ = documents[i]
+        try:
+            return await text_extraction.extract_text_async(filename, key), None
+        except HTTPException as e:
+            return None, e.detail
+
+    outcomes = await asyncio.gather(*(parse(i) for i in to_parse))
+
+    parsed_indices = []
+    parsed = []
+    for i, (text, error) in zip(to_parse, outcomes):
+        if error:
+            results[i].error = error
+        else:
+            parsed_indices.append(i)
+            parsed.append((documents[i][0], text, c_hashes[i]))
+
+    if parsed:
+        stored = await run_in_threadpool(_store_resumes, db, parsed)
+        for i, (db_resume, duplicate) in zip(parsed_indices, stored):
+            results[i].status = "duplicate" if duplicate else "created"
+            results[i].id = db_resume.id
+
+    # Byte-identical copies within this upload follow their first copy
+    for i, result in enumerate(results):
+        if result.status == "duplicate" and result.id is None:
+            first = results[first_with_hash[c_hashes[i]]]
+            result.id = first.id
+            if first.status == "failed":
+                result.status, result.error = "failed", first.error
+
+    # Blobs of documents that failed or matched an existing resume's text
+    await run_in_threadpool(_discard_unreferenced_blobs, db, c_hashes)
+    return results
 
 @router.get("/", response_model=list[ResumeResponse])
-def get_resumes(db: Session = Depends(get_db)):
-    resumes = db.query(Resume).order_by(Resume.created_at.desc()).all()
+def get_resumes(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Newest resumes first, one page at a time. Only the listed columns are
+    loaded (never resume_text or cached vectors). Pass the X-Next-After-Id
+    response header back as after_id for the next page.
+    """
+    query = db.query(Resume).options(load_only(Resume.id, Resume.filename, Resume.created_at))
+    resumes = pagination.keyset_page(query, Resume.id, limit, after_id, response)
     # Manual map or let Pydantic handle it
     return [
         ResumeResponse(id=r.id, filename=r.filename, created_at=str(r.created_at)) 
         for r in resumes
     ]
+
+@router.get("/search", response_model=SkillSearchResponse)
+def search_resumes(
+    q: str,
+    jd_id: Optional[int] = None,
+    top_k: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Resumes matching a boolean skill query, e.g. "kubernetes AND go AND
+    (aws OR gcp)", answered from the inverted skill index without loading
+    any resume. Matches are scored by the share of the query's skills they
+    have, or of the JD's skills if jd_id is given (the skill_match score),
+    and the top_k are returned.
+    """
+    try:
+        node = skill_index.parse_query(q)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    score_skills = skill_index.query_skills(node)
+    if jd_id is not None:
+        jd = db.query(JobDescription).filter(JobDescription.id == jd_id).first()
+        if not jd:
+            raise HTTPException(status_code=404, detail="Job Description not found")
+        jd_skills = feature_store.get_features(jd, jd.jd_text)["skills"]
+        db.commit() # JD features refreshed if stale
+        score_skills = jd_skills or score_skills
+
+    total, results = skill_index.get_index(db).search(node, score_skills, top_k)
+    filenames = dict(
+        db.query(Resume.id, Resume.filename)
+        .filter(Resume.id.in_([r["resume_id"] for r in results]))
+        .all()
+    )
+    return SkillSearchResponse(
+        query=skill_index.format_query(node),
+        total=total,
+        results=[SkillSearchResult(filename=filenames.get(r["resume_id"]), **r) for r in results]
+    )
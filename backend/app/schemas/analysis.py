@@ -27,7 +27,38 @@ class AnalysisResponse(BaseModel):
     optimized_bullets: Optional[List[Dict[str, str]]] = None
     generated_resume_text: Optional[str] = None
     
+    # Set when LLM work was queued; poll GET /analysis/jobs/{job_id}
+    job_id: Optional[int] = None
+    llm_status: Optional[str] = None
+    
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnalysisSummary(BaseModel):
+    id: int
+    resume_id: int
+    jd_id: int
+    ats_score: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AnalysisJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    analysis_id: Optional[int] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    
+    # Populated once the job's analysis exists (LLM fields filled when done)
+    analysis: Optional[AnalysisResponse] = None
+    
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -1,16 +1,29 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict, Optional
 
 class JDBase(BaseModel):
     role: str
     jd_text: str
 
 class JDCreate(JDBase):
-    pass
+    scoring_weights: Optional[Dict[str, float]] = None # Scorer name -> weight, over the defaults
+
+class JDSummary(BaseModel):
+    id: int
+    role: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 class JDResponse(JDBase):
     id: int
+    scoring_weights: Optional[Dict[str, float]] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+class ScoringWeights(BaseModel):
+    weights: Dict[str, float]
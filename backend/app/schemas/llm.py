@@ -15,5 +15,10 @@ class GenerateSummaryRequest(LLMRequestBase):
 class GenerateResumeRequest(LLMRequestBase):
     candidate_name: str
 
+class BatchRewriteRequest(BaseModel):
+    jd_id: int
+    resume_ids: List[int]
+    target_role: Optional[str] = None # Defaults to the JD's role
+
 class LLMResponseBase(BaseModel):
     content: Any # JSON or string
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.analysis import ResumeAnalysis
+from app.models.job import AnalysisJob
+from app.services import openrouter_client, prompt_templates, prompt_budget, job_queue
+
+async def _call_with_timeout(prompts: list[dict]) -> str:
+    return await asyncio.wait_for(
+        openrouter_client.acall_openrouter(prompts),
+        timeout=settings.LLM_CALL_TIMEOUT
+    )
+
+async def agenerate_llm_suggestions(
+    resume_text: str,
+    jd_text: str,
+    target_role: str,
+    candidate_name: str,
+    missing_skills: list[str],
+    include_summary: bool = True
+) -> dict:
+    """
+    Runs the LLM augmentation for one resume/JD pair: rewritten bullets, a
+    full optimized resume draft and (optionally) a profile summary. The
+    prompts are independent, so they are issued concurrently and wall-clock
+    time approaches the slowest single call. Each call has its own timeout
+    and fails independently; errors are collected instead of raised so
+    partial results are kept.
+    Resume and JD are fitted to the prompt token budget once and shared by
+    all three prompts.
+    """
+    fitted = prompt_budget.fit_inputs(resume_text, jd_text, missing_skills)
+    resume_text, jd_text = fitted["resume_text"], fitted["jd_text"]
+    steps = {
+        "bullets": prompt_templates.build_rewrite_bullets_prompt(
+            resume_text, jd_text, missing_skills, target_role
+        ),
+        "resume": prompt_templates.build_full_resume_prompt(
+            resume_text, jd_text, target_role, candidate_name
+        ),
+    }
+    if include_summary:
+        steps["summary"] = prompt_templates.build_summary_prompt(resume_text, jd_text, target_role)
+
+    responses = await asyncio.gather(
+        *(_call_with_timeout(prompts) for prompts in steps.values()),
+        return_exceptions=True
+    )
+    results = dict(zip(steps.keys(), responses))
+
+    suggestions = {
+        "optimized_bullets": None,
+        "generated_resume_text": None,
+        "summary": None,
+        "errors": [],
+        "prompt_tokens_saved": fitted["tokens_saved"]
+    }
+    for step, resp in results.items():
+        if isinstance(resp, BaseException):
+            detail = "timed out" if isinstance(resp, asyncio.TimeoutError) else getattr(resp, "detail", str(resp))
+            print(f"LLM Error ({step}): {detail}")
+            suggestions["errors"].append(f"{step}: {detail}")
+
+    if isinstance(results["bullets"], str):
+        try:
+            suggestions["optimized_bullets"] = json.loads(results["bullets"])["rewritten_bullets"]
+        except:
+            # Fallback if valid JSON not found in mocked/raw response
+            pass
+
+    if isinstance(results["resume"], str):
+        suggestions["generated_resume_text"] = results["resume"] # Keep raw string or JSON string
+
+    if isinstance(results.get("summary"), str):
+        try:
+            suggestions["summary"] = json.loads(results["summary"])["summary"]
+        except:
+            suggestions["summary"] = results["summary"]
+
+    return suggestions
+
+def generate_llm_suggestions(resume, jd, missing_skills: list[str]) -> dict:
+    """
+    Synchronous entry point for worker threads: pulls what the prompts need
+    off the ORM rows, then runs the concurrent calls on a private event loop.
+    """
+    async def run():
+        try:
+            return await agenerate_llm_suggestions(
+                resume.resume_text or "",
+                jd.jd_text or "",
+                jd.role or "Target Role",
+                resume.user.name if resume.user else "Candidate",
+                missing_skills
+            )
+        finally:
+            # The loop dies with asyncio.run, so release its pooled client
+            await openrouter_client.aclose_async_client()
+
+    return asyncio.run(run())
+
+@job_queue.register_handler("analysis_llm")
+def process_analysis_job(db: Session, job: AnalysisJob):
+    """
+    Background half of /analysis/run with use_llm: the deterministic score
+    is already stored, this fills in the LLM fields of the same analysis.
+    The summary has no analysis column, so it is kept on the job result.
+    """
+    analysis = db.get(ResumeAnalysis, job.analysis_id)
+    if analysis is None:
+        raise ValueError(f"Analysis {job.analysis_id} not found")
+
+    suggestions = generate_llm_suggestions(
+        analysis.resume, analysis.job_description, analysis.missing_skills or []
+    )
+    # Nothing came back (e.g. a provider outage): fail the job so the next
+    # /analysis/run retries it instead of reusing an empty result
+    produced = ("optimized_bullets", "generated_resume_text", "summary")
+    if suggestions["errors"] and not any(suggestions[key] for key in produced):
+        raise RuntimeError("; ".join(suggestions["errors"]))
+    analysis.optimized_bullets = suggestions["optimized_bullets"]
+    analysis.generated_resume_text = suggestions["generated_resume_text"]
+    job.result = {
+        "summary": suggestions["summary"],
+        "prompt_tokens_saved": suggestions["prompt_tokens_saved"]
+    }
+    if suggestions["errors"]:
+        job.error = "; ".join(suggestions["errors"])
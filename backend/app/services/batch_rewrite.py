@@ -0,0 +1,126 @@
+import asyncio
+import json
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.resume import Resume
+from app.models.job_description import JobDescription
+from app.models.job import AnalysisJob
+from app.services import openrouter_client, prompt_templates, prompt_budget, feature_store, job_queue
+
+async def _rewrite_one(semaphore: asyncio.Semaphore, candidate: dict, jd_text: str, target_role: str) -> dict:
+    """Optimized bullets for one resume; failures are recorded, not raised."""
+    result = {
+        "resume_id": candidate["resume_id"],
+        "filename": candidate["filename"],
+        "missing_skills": candidate["missing_skills"],
+        "optimized_bullets": None,
+        "content": None,
+        "prompt_tokens_saved": 0,
+        "error": None
+    }
+    async with semaphore:
+        try:
+            fitted = prompt_budget.fit_inputs(candidate["resume_text"], jd_text, candidate["missing_skills"])
+            result["prompt_tokens_saved"] = fitted["tokens_saved"]
+            prompts = prompt_templates.build_rewrite_bullets_prompt(
+                fitted["resume_text"], fitted["jd_text"], candidate["missing_skills"], target_role
+            )
+            response_text = await asyncio.wait_for(
+                openrouter_client.acall_openrouter(prompts),
+                timeout=settings.LLM_CALL_TIMEOUT
+            )
+        except Exception as e:
+            detail = "timed out" if isinstance(e, asyncio.TimeoutError) else getattr(e, "detail", str(e))
+            print(f"LLM Error (batch resume {candidate['resume_id']}): {detail}")
+            result["error"] = detail
+            return result
+
+    try:
+        result["optimized_bullets"] = json.loads(response_text)["rewritten_bullets"]
+    except:
+        # Keep the raw completion if the model did not return the JSON shape
+        result["content"] = response_text
+    return result
+
+async def arewrite_candidates(candidates: list[dict], jd_text: str, target_role: str, on_result=None) -> list[dict]:
+    """
+    Fans the bullet rewrite out over many resumes for one JD, at most
+    LLM_BATCH_CONCURRENCY at a time (the LLM governor still applies on top).
+    The JD is fitted to its share of the prompt budget once up front, so
+    every prompt carries the same JD text, which also keeps the prompt
+    prefix identical across the batch. on_result(result) is called as
+    each resume finishes; results are returned in input order.
+    """
+    budget = prompt_budget.get_model_budget()
+    jd_text = prompt_budget.fit_jd(jd_text or "", int(budget * settings.LLM_JD_BUDGET_SHARE))
+    semaphore = asyncio.Semaphore(max(1, settings.LLM_BATCH_CONCURRENCY))
+
+    tasks = [
+        asyncio.ensure_future(_rewrite_one(semaphore, candidate, jd_text, target_role))
+        for candidate in candidates
+    ]
+    for finished in asyncio.as_completed(tasks):
+        result = await finished
+        if on_result:
+            on_result(result)
+    return [task.result() for task in tasks]
+
+@job_queue.register_handler("batch_rewrite")
+def process_batch_rewrite_job(db: Session, job: AnalysisJob):
+    """
+    Background job for POST /llm/batch_rewrite. job.result is updated and
+    committed after every resume so pollers can follow progress:
+    {"jd_id", "total", "completed", "failed", "results": [...]}.
+    Completions come from the shared LLM response cache when the same
+    resume/JD prompt was already answered.
+    """
+    payload = job.payload or {}
+    jd = db.get(JobDescription, payload.get("jd_id"))
+    if jd is None:
+        raise ValueError(f"Job Description {payload.get('jd_id')} not found")
+
+    resume_ids = list(dict.fromkeys(payload.get("resume_ids") or []))
+    resumes = {r.id: r for r in db.query(Resume).filter(Resume.id.in_(resume_ids)).all()}
+    jd_skills = set(feature_store.get_features(jd, jd.jd_text)["skills"])
+
+    # Pull everything the prompts need off the ORM rows before going async
+    candidates = []
+    for resume_id in resume_ids:
+        resume = resumes.get(resume_id)
+        if resume is None:
+            continue
+        resume_skills = set(feature_store.get_features(resume, resume.resume_text)["skills"])
+        candidates.append({
+            "resume_id": resume.id,
+            "filename": resume.filename,
+            "resume_text": resume.resume_text or "",
+            "missing_skills": sorted(jd_skills - resume_skills),
+        })
+    db.commit() # any re-extracted features
+
+    progress = {
+        "jd_id": jd.id,
+        "total": len(candidates),
+        "completed": 0,
+        "failed": 0,
+        "not_found": [rid for rid in resume_ids if rid not in resumes],
+        "results": []
+    }
+
+    def on_result(result: dict):
+        progress["completed"] += 1
+        progress["failed"] += 1 if result["error"] else 0
+        progress["results"].append(result)
+        job.result = dict(progress, results=list(progress["results"]))
+        db.commit()
+
+    async def run():
+        try:
+            return await arewrite_candidates(candidates, jd.jd_text, payload.get("target_role") or jd.role or "Target Role", on_result)
+        finally:
+            await openrouter_client.aclose_async_client()
+
+    ordered = asyncio.run(run())
+    job.result = dict(progress, results=ordered)
+    if progress["failed"]:
+        job.error = f"{progress['failed']} of {progress['total']} resumes failed"
@@ -0,0 +1,178 @@
+import hashlib
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Optional
+from app.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+class BlobTooLargeError(Exception):
+    pass
+
+def _copy_hashing(source: BinaryIO, target: BinaryIO, max_bytes: int = 0) -> tuple[str, int]:
+    """
+    Streams source into target chunk by chunk, returning (sha256, size).
+    Raises BlobTooLargeError as soon as more than max_bytes (0 = no limit)
+    have been read.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := source.read(CHUNK_SIZE):
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise BlobTooLargeError(f"File too large (limit {max_bytes // (1024 * 1024)} MB)")
+        digest.update(chunk)
+        target.write(chunk)
+    return digest.hexdigest(), size
+
+class BlobStore(ABC):
+    """
+    Content-addressed storage for uploaded files: the key of a blob is the
+    sha256 of its bytes, so storing the same file twice is a no-op and the
+    key doubles as Resume.content_hash.
+    """
+
+    scheme = ""
+
+    @abstractmethod
+    def put_file(self, source: BinaryIO, max_bytes: int = 0) -> tuple[str, int]:
+        """Streams a file object into the store; returns (key, size)."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Readable binary file object for a stored blob; the caller closes it."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def uri(self, key: str) -> str:
+        """Location recorded in Resume.file_path."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Removes a blob; missing blobs are ignored."""
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs on the local filesystem under root/ab/cd/<sha256>. The two-level
+    shard keeps directories small with millions of files.
+    """
+
+    scheme = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put_file(self, source, max_bytes=0):
+        os.makedirs(self.root, exist_ok=True)
+        # Write to a temp file in the same filesystem, then rename into place
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                key, size = _copy_hashing(source, tmp, max_bytes)
+            path = self._path(key)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key, size
+
+    def open(self, key):
+        return open(self._path(key), "rb")
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def uri(self, key):
+        return f"{self.scheme}://{key[:2]}/{key[2:4]}/{key}"
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs in an S3-compatible bucket under prefix/ab/cd/<sha256>. Point
+    endpoint_url at MinIO or another stand-in to run without AWS. boto3 is
+    only imported when this store is used; a client may also be injected.
+    """
+
+    scheme = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, client=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("BLOB_STORE=s3 requires the boto3 package (pip install boto3)")
+            client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key[2:4]}/{key}"
+
+    def put_file(self, source, max_bytes=0):
+        # The key is only known once every byte is hashed, so spool first
+        # (in memory up to 8 MB, on disk beyond) and upload the spool.
+        with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE) as spool:
+            key, size = _copy_hashing(source, spool, max_bytes)
+            if not self.exists(key):
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, self._object_key(key))
+        return key, size
+
+    def open(self, key):
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE)
+        self.client.download_fileobj(self.bucket, self._object_key(key), spool)
+        spool.seek(0)
+        return spool
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except Exception:
+            return False
+
+    def uri(self, key):
+        return f"{self.scheme}://{self.bucket}/{self._object_key(key)}"
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store selected by BLOB_STORE ("local" or "s3")."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.BLOB_STORE == "s3":
+                    _store = S3BlobStore(
+                        settings.BLOB_S3_BUCKET,
+                        settings.BLOB_S3_PREFIX,
+                        settings.BLOB_S3_ENDPOINT_URL
+                    )
+                elif settings.BLOB_STORE == "local":
+                    _store = LocalBlobStore(settings.BLOB_STORE_PATH)
+                else:
+                    raise ValueError(f"Unknown BLOB_STORE '{settings.BLOB_STORE}'")
+    return _store
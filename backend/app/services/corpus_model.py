@@ -0,0 +1,253 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are only serialized within a process
+    fcntl = None
+
+# Hashed term space shared by every stored vector. Changing it invalidates
+# all cached term vectors and the saved model.
+N_FEATURES = 2 ** 18
+
+_vectorizer = HashingVectorizer(
+    n_features=N_FEATURES,
+    stop_words='english',
+    alternate_sign=False,
+    norm=None
+)
+
+def term_counts(texts: list[str]) -> sparse.csr_matrix:
+    """
+    Raw term counts for each text in the hashed term space.
+    Counts (not TF-IDF weights) are what gets cached per document, so the
+    vectors stay valid while the corpus IDF keeps changing.
+    """
+    return _vectorizer.transform([text or "" for text in texts])
+
+def encode_vector(row: sparse.csr_matrix) -> bytes:
+    """Packs a single sparse row as int32 indices followed by float32 counts."""
+    return row.indices.astype("<i4").tobytes() + row.data.astype("<f4").tobytes()
+
+def decode_vectors(blobs: list[bytes]) -> sparse.csr_matrix:
+    """Stacks encoded vectors back into one CSR matrix (one row per blob)."""
+    indptr = [0]
+    indices = []
+    data = []
+    for blob in blobs:
+        half = len(blob or b"") // 2
+        indices.append(np.frombuffer(blob or b"", dtype="<i4", count=half // 4))
+        data.append(np.frombuffer(blob or b"", dtype="<f4", offset=half))
+        indptr.append(indptr[-1] + half // 4)
+
+    return sparse.csr_matrix(
+        (
+            np.concatenate(data) if data else np.empty(0, dtype=np.float32),
+            np.concatenate(indices) if indices else np.empty(0, dtype=np.int32),
+            np.array(indptr),
+        ),
+        shape=(len(blobs), N_FEATURES),
+    )
+
+@contextmanager
+def _file_lock(path: str):
+    """Serializes saves of one model file across worker processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+class CorpusModel:
+    """
+    Corpus-wide IDF over every stored resume and JD.
+    Keeps per-term document frequencies so new documents can be folded in
+    incrementally; IDF uses the same smoothed formula as TfidfVectorizer.
+    Documents added since the last save are tracked separately so a save
+    can merge them into whatever other processes have written meanwhile.
+    """
+
+    def __init__(self, doc_freq: np.ndarray | None = None, n_docs: int = 0):
+        self.doc_freq = doc_freq if doc_freq is not None else np.zeros(N_FEATURES, dtype=np.int64)
+        self.n_docs = n_docs
+        self._idf = None
+        self._lock = threading.Lock()
+        self._unsaved_freq = np.zeros(N_FEATURES, dtype=np.int64)
+        self._unsaved_docs = 0
+        self._saved_at = time.monotonic()
+
+    def add_documents(self, counts: sparse.csr_matrix):
+        """Folds new documents (rows of raw counts) into the document frequencies."""
+        if counts.shape[0] == 0:
+            return
+        present = counts.copy()
+        present.data = np.ones_like(present.data)
+        freq = np.asarray(present.sum(axis=0), dtype=np.int64).ravel()
+        with self._lock:
+            self.doc_freq += freq
+            self.n_docs += counts.shape[0]
+            self._unsaved_freq += freq
+            self._unsaved_docs += counts.shape[0]
+            self._idf = None
+
+    def idf(self) -> np.ndarray:
+        if self._idf is None:
+            with self._lock:
+                self._idf = np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+        return self._idf
+
+    def weigh(self, counts: sparse.csr_matrix) -> sparse.csr_matrix:
+        """Applies the current IDF and L2-normalizes each row."""
+        return normalize(sparse.csr_matrix(counts.multiply(self.idf())))
+
+    def similarities(self, resume_counts: sparse.csr_matrix, jd_counts: sparse.csr_matrix) -> np.ndarray:
+        """
+        Cosine similarity (as a 0-100 percentage) of every resume row against
+        the JD row. With cached counts this is a single sparse dot product.
+        """
+        jd_vec = self.weigh(jd_counts)
+        if resume_counts.shape[0] == 0 or jd_vec.nnz == 0:
+            return np.zeros(resume_counts.shape[0])
+        sims = (self.weigh(resume_counts) @ jd_vec.T).toarray().ravel()
+        return np.round(sims * 100, 2)
+
+    def save(self, path: str, merge: bool = True):
+        """
+        Writes the model atomically so readers never see a partial file.
+        With merge, documents added since the last save are folded into the
+        model on disk (which other processes may have updated) and this
+        model adopts the result; without it the file is overwritten.
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, _file_lock(path):
+            if merge and os.path.exists(path):
+                with np.load(path) as data:
+                    doc_freq = data["doc_freq"].astype(np.int64) + self._unsaved_freq
+                    n_docs = int(data["n_docs"]) + self._unsaved_docs
+            else:
+                doc_freq, n_docs = self.doc_freq, self.n_docs
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".corpus-model-", suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez_compressed(f, doc_freq=doc_freq, n_docs=np.array(n_docs))
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            self.doc_freq, self.n_docs = doc_freq, n_docs
+            self._unsaved_freq = np.zeros(N_FEATURES, dtype=np.int64)
+            self._unsaved_docs = 0
+            self._saved_at = time.monotonic()
+            self._idf = None
+
+    def save_if_due(self, path: str, interval: float):
+        """Saves unsaved documents once interval seconds have passed since the last save."""
+        if self._unsaved_docs and time.monotonic() - self._saved_at >= interval:
+            self.save(path)
+
+    @classmethod
+    def load(cls, path: str) -> "CorpusModel":
+        with np.load(path) as data:
+            return cls(doc_freq=data["doc_freq"].astype(np.int64), n_docs=int(data["n_docs"]))
+
+_model: CorpusModel | None = None
+_model_lock = threading.Lock()
+
+def get_model() -> CorpusModel:
+    """
+    Returns the process-wide corpus model, loading it from disk on first use
+    or rebuilding it from the database if no saved model exists yet. The
+    app calls this at startup (see main.py), so requests find it loaded.
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if os.path.exists(settings.CORPUS_MODEL_PATH):
+                    _model = CorpusModel.load(settings.CORPUS_MODEL_PATH)
+                else:
+                    _model = rebuild_model()
+    return _model
+
+def index_documents(docs: list, texts: list[str]):
+    """
+    Caches term vectors on freshly created Resume/JobDescription rows and
+    folds them into the corpus model. The caller commits the rows.
+    """
+    if not docs:
+        return
+    counts = term_counts(texts)
+    for i, doc in enumerate(docs):
+        doc.term_vector = encode_vector(counts[i])
+
+    model = get_model()
+    model.add_documents(counts)
+    model.save_if_due(settings.CORPUS_MODEL_PATH, settings.CORPUS_MODEL_SAVE_INTERVAL)
+
+def flush():
+    """Saves documents added since the last save (called on shutdown)."""
+    if _model is not None and _model._unsaved_docs:
+        _model.save(settings.CORPUS_MODEL_PATH)
+
+def document_vectors(docs: list, texts: list[str]) -> sparse.csr_matrix:
+    """
+    Cached term vectors for existing rows. Rows stored before vectors were
+    cached get them computed and attached here (the caller commits), without
+    touching the corpus statistics they are already counted in.
+    """
+    missing = [i for i, doc in enumerate(docs) if doc.term_vector is None]
+    if missing:
+        counts = term_counts([texts[i] for i in missing])
+        for row, i in enumerate(missing):
+            docs[i].term_vector = encode_vector(counts[row])
+    return decode_vectors([doc.term_vector for doc in docs])
+
+def rebuild_model(batch_size: int = 500) -> CorpusModel:
+    """
+    Trains the corpus model from scratch over every stored resume and JD,
+    caching any missing term vectors along the way, and saves it to disk.
+    """
+    from app.database import SessionLocal
+    from app.models.resume import Resume
+    from app.models.job_description import JobDescription
+
+    model = CorpusModel()
+    db = SessionLocal()
+    try:
+        for model_cls, text_attr in ((Resume, "resume_text"), (JobDescription, "jd_text")):
+            batch = []
+            for doc in db.query(model_cls).yield_per(batch_size):
+                batch.append(doc)
+                if len(batch) == batch_size:
+                    model.add_documents(document_vectors(batch, [getattr(d, text_attr) for d in batch]))
+                    batch = []
+            if batch:
+                model.add_documents(document_vectors(batch, [getattr(d, text_attr) for d in batch]))
+        db.commit()
+    finally:
+        db.close()
+
+    # The database is the source of truth here: replace, don't merge
+    model.save(settings.CORPUS_MODEL_PATH, merge=False)
+    return model
+
+if __name__ == "__main__":
+    # python -m app.services.corpus_model  -> retrain from the database
+    rebuilt = rebuild_model()
+    print(f"Corpus model rebuilt over {rebuilt.n_docs} documents -> {settings.CORPUS_MODEL_PATH}")
@@ -0,0 +1,75 @@
+import hashlib
+from typing import Iterable, Optional
+from sqlalchemy.orm import Session
+from app.models.resume import Resume
+
+def normalize_text(text: str) -> str:
+    """Case and whitespace folded, so re-exports of the same resume hash alike."""
+    return " ".join((text or "").lower().split())
+
+def text_hash(text: str) -> Optional[str]:
+    """
+    sha256 of the normalized extracted text. None for empty text, so
+    files that yield no text (scans, broken exports) are never merged.
+    """
+    normalized = normalize_text(text)
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def _find_by(db: Session, column, hashes: Iterable[Optional[str]]) -> dict[str, Resume]:
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+    found = {}
+    # Oldest row wins when legacy duplicates share a hash
+    for resume in db.query(Resume).filter(column.in_(hashes)).order_by(Resume.id.desc()):
+        found[getattr(resume, column.key)] = resume
+    return found
+
+def find_by_content_hashes(db: Session, hashes: Iterable[Optional[str]]) -> dict[str, Resume]:
+    """
+    Existing resumes keyed by raw-bytes hash (the file's blob store key),
+    in one query.
+    """
+    return _find_by(db, Resume.content_hash, hashes)
+
+def find_by_text_hashes(db: Session, hashes: Iterable[Optional[str]]) -> dict[str, Resume]:
+    """Existing resumes keyed by normalized-text hash, in one query."""
+    return _find_by(db, Resume.text_hash, hashes)
+
+def backfill_text_hashes(batch_size: int = 500) -> int:
+    """
+    Fills text_hash on rows stored before hashing existed and returns how
+    many were updated. Raw bytes were never kept, so content_hash cannot be
+    backfilled; those rows pick it up when the same file is uploaded again
+    and matches on text.
+    """
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    updated = 0
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Resume)
+                .filter(Resume.text_hash.is_(None), Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for resume in batch:
+                resume.text_hash = text_hash(resume.resume_text)
+                updated += 1 if resume.text_hash else 0
+            last_id = batch[-1].id
+            db.commit()
+    finally:
+        db.close()
+    return updated
+
+if __name__ == "__main__":
+    # python -m app.services.dedupe  -> hash resumes stored before dedupe existed
+    print(f"Backfilled text_hash on {backfill_text_hashes()} resumes")
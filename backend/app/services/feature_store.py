@@ -0,0 +1,46 @@
+import hashlib
+import json
+from app.utils import extraction
+from app.utils.skills import MASTER_SKILLS, SYNONYM_MAP
+
+# Bump whenever extract_features (or any extractor it calls) changes output.
+EXTRACTOR_VERSION = 3
+
+def _features_version() -> str:
+    """
+    Version tag stored next to cached features: the extractor version plus
+    a digest of the skills list and synonym map, so editing either one
+    marks every cached row stale.
+    """
+    digest = hashlib.sha256(
+        json.dumps([sorted(MASTER_SKILLS), SYNONYM_MAP], sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return f"{EXTRACTOR_VERSION}-{digest[:12]}"
+
+FEATURES_VERSION = _features_version()
+
+def extract_features(text: str) -> dict:
+    """
+    Parses everything the scoring pipeline needs from a document's text,
+    in a single pass (see app.utils.extraction).
+    """
+    return extraction.extract_features(text)
+
+def is_stale(doc) -> bool:
+    """True if a row has no cached features or they predate FEATURES_VERSION."""
+    return doc.features is None or doc.features_version != FEATURES_VERSION
+
+def store_features(doc, features: dict):
+    """Attaches freshly extracted features to a row; the caller commits."""
+    doc.features = features
+    doc.features_version = FEATURES_VERSION
+
+def get_features(doc, text: str) -> dict:
+    """
+    Cached features for a Resume or JobDescription row. Missing or stale
+    rows (older FEATURES_VERSION) are re-extracted and updated in place;
+    the caller commits.
+    """
+    if is_stale(doc):
+        store_features(doc, extract_features(text))
+    return doc.features
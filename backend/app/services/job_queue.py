@@ -0,0 +1,143 @@
+import threading
+from typing import Callable, Dict, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import AnalysisJob
+
+# kind -> handler(db, job). Handlers do the work and may fill job.result /
+# job.error; the queue marks the job done (or failed if the handler raises).
+JOB_HANDLERS: Dict[str, Callable[[Session, AnalysisJob], None]] = {}
+
+_wakeup = threading.Event()
+_workers: list[threading.Thread] = []
+_workers_lock = threading.Lock()
+
+def register_handler(kind: str):
+    """Decorator registering the function that processes jobs of this kind."""
+    def decorator(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return decorator
+
+def enqueue(db: Session, kind: str, analysis_id: Optional[int] = None, payload: Optional[dict] = None) -> AnalysisJob:
+    """
+    Persists a queued job and wakes a worker. The job row is committed
+    before returning so the id can be handed to the client immediately.
+    """
+    job = AnalysisJob(kind=kind, status="queued", analysis_id=analysis_id, payload=payload)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    start_workers()
+    _wakeup.set()
+    return job
+
+def enqueue_once(db: Session, kind: str, analysis_id: int) -> AnalysisJob:
+    """
+    The newest queued, running or done job of this kind for the analysis,
+    or a newly enqueued one if there is none (or only failed ones, which
+    are retried).
+    """
+    job = (
+        db.query(AnalysisJob)
+        .filter(
+            AnalysisJob.kind == kind,
+            AnalysisJob.analysis_id == analysis_id,
+            AnalysisJob.status.in_(("queued", "running", "done"))
+        )
+        .order_by(AnalysisJob.id.desc())
+        .first()
+    )
+    return job if job is not None else enqueue(db, kind, analysis_id=analysis_id)
+
+def start_workers():
+    """
+    Starts the in-process worker threads (idempotent). Jobs left "running"
+    by a previous process that died mid-job are put back in the queue.
+    """
+    with _workers_lock:
+        if _workers:
+            return
+
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.status == "running")
+                .values(status="queued")
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        for i in range(max(settings.JOB_WORKERS, 1)):
+            worker = threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            _workers.append(worker)
+
+def _claim_next() -> Optional[int]:
+    """
+    Atomically moves the oldest queued job to "running". The conditional
+    UPDATE makes the claim safe across threads and processes sharing the
+    database: only one claimant sees rowcount == 1.
+    """
+    db = SessionLocal()
+    try:
+        candidates = [
+            job_id for (job_id,) in db.query(AnalysisJob.id)
+            .filter(AnalysisJob.status == "queued")
+            .order_by(AnalysisJob.id)
+            .limit(10)
+        ]
+        for job_id in candidates:
+            claimed = db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+                .values(status="running", updated_at=func.now())
+            )
+            db.commit()
+            if claimed.rowcount == 1:
+                return job_id
+        return None
+    finally:
+        db.close()
+
+def _worker_loop():
+    while True:
+        _wakeup.clear()
+        try:
+            job_id = _claim_next()
+        except Exception as e:
+            print(f"Job queue error: {e}")
+            job_id = None
+
+        if job_id is None:
+            _wakeup.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        run_job(job_id)
+
+def run_job(job_id: int):
+    """Runs a claimed job's handler in its own session and records the outcome."""
+    db = SessionLocal()
+    try:
+        job = db.get(AnalysisJob, job_id)
+        handler = JOB_HANDLERS.get(job.kind)
+        if handler is None:
+            raise ValueError(f"No handler registered for job kind '{job.kind}'")
+        handler(db, job)
+        job.status = "done"
+        db.commit()
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+        db.rollback()
+        job = db.get(AnalysisJob, job_id)
+        if job:
+            job.status = "failed"
+            job.error = str(e)
+            db.commit()
+    finally:
+        db.close()
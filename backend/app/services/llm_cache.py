@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from app.config import settings
+
+def cache_key(model: str, messages: list) -> str:
+    """Content address of a completion request: sha256 over (model, messages)."""
+    canonical = json.dumps(
+        {"model": model, "messages": messages},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class CacheBackend(ABC):
+    """
+    Storage tier interface. Entries are (value, expires_at) with expires_at
+    as a UNIX timestamp; backends evict by size, the cache handles TTL.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, expires_at: float) -> int:
+        """Stores an entry and returns how many entries were evicted for room."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU bounded by entry count."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteBackend(CacheBackend):
+    """
+    On-disk tier in a standalone SQLite file, shared by every worker process
+    on the host and surviving restarts. Evicts least recently used entries
+    beyond max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)"
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+            return row
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time())
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            self._conn.commit()
+            return evicted
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+class LLMResponseCache:
+    """
+    Read-through cache of completion texts over ordered tiers (fastest
+    first). A hit in a slower tier is copied into the faster ones; expired
+    entries count as misses and are dropped.
+    """
+
+    def __init__(self, tiers: list[CacheBackend], ttl: float):
+        self.tiers = tiers
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+        self.tier_hits = [0] * len(tiers)
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.stats[name] += n
+
+    def get(self, model: str, messages: list) -> Optional[str]:
+        key = cache_key(model, messages)
+        now = time.time()
+        for i, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+            value, expires_at = entry
+            if expires_at <= now:
+                tier.delete(key)
+                self._count("expired")
+                continue
+            for faster in self.tiers[:i]:
+                self._count("evictions", faster.set(key, value, expires_at))
+            with self._lock:
+                self.stats["hits"] += 1
+                self.tier_hits[i] += 1
+            return value
+
+        self._count("misses")
+        return None
+
+    def set(self, model: str, messages: list, value: str):
+        key = cache_key(model, messages)
+        expires_at = time.time() + self.ttl
+        for tier in self.tiers:
+            self._count("evictions", tier.set(key, value, expires_at))
+        self._count("sets")
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            tier_hits = list(self.tier_hits)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["tiers"] = [
+            {"backend": type(tier).__name__, "entries": len(tier), "hits": hits}
+            for tier, hits in zip(self.tiers, tier_hits)
+        ]
+        return stats
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[LLMResponseCache]:
+    """
+    Process-wide cache built from settings: an in-memory LRU, plus the
+    SQLite tier when LLM_CACHE_DISK_PATH is set. None when disabled.
+    """
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                tiers: list[CacheBackend] = [MemoryLRUBackend(settings.LLM_CACHE_MEMORY_ENTRIES)]
+                if settings.LLM_CACHE_DISK_PATH:
+                    tiers.append(SQLiteBackend(settings.LLM_CACHE_DISK_PATH, settings.LLM_CACHE_DISK_ENTRIES))
+                _cache = LLMResponseCache(tiers, ttl=settings.LLM_CACHE_TTL)
+    return _cache
@@ -0,0 +1,306 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from fastapi import HTTPException
+from app.config import settings
+
+# Upstream statuses worth retrying: rate limited or a transient server fault.
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve a token and get back how long
+    to wait for it, so sync and async callers can share one bucket (each
+    sleeps its own way) and requests are admitted in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Takes a token, returning the seconds until it is usable, or None
+        (taking nothing) if that would be longer than max_wait.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+class CircuitBreaker:
+    """
+    Fails fast while the upstream is down: after `threshold` consecutive
+    failures the circuit opens for `cooldown` seconds, then lets a single
+    probe through (half-open). A success closes it, a failure re-opens it.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == "half_open" or self._failures >= self.threshold > 0:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+    def cancel_probe(self):
+        """Frees the half-open probe when an admitted caller never sent it."""
+        with self._lock:
+            self._probing = False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header as seconds (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class LLMGovernor:
+    """
+    Admission control shared by every OpenRouter call in the process (sync
+    routes, background jobs and streams): a request rate limit, a cap on
+    in-flight calls, jittered retry backoff and a circuit breaker.
+    Callers that cannot be admitted within queue_timeout are rejected
+    instead of piling up behind the limit.
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int, queue_timeout: float,
+                 max_retries: int, backoff_base: float, backoff_max: float,
+                 breaker_threshold: int, breaker_cooldown: float):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._lock = threading.Lock()
+        self.stats = {
+            "admitted": 0, "rejected_rate_limit": 0, "rejected_concurrency": 0,
+            "rejected_circuit_open": 0, "retries": 0, "failures": 0,
+            "queue_wait_total": 0.0, "queue_wait_max": 0.0, "in_flight": 0,
+        }
+
+    def _count(self, name: str, n: float = 1):
+        with self._lock:
+            self.stats[name] += n
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            self._count("rejected_circuit_open")
+            raise HTTPException(
+                status_code=503,
+                detail=f"OpenRouter is unavailable; retry in {self.breaker.retry_in():.0f}s"
+            )
+
+    def _reserve_token(self) -> float:
+        wait = self.bucket.reserve(self.queue_timeout)
+        if wait is None:
+            self._count("rejected_rate_limit")
+            raise HTTPException(status_code=429, detail="LLM request rate limit exceeded; try again later")
+        return wait
+
+    def _reject_concurrency(self):
+        self._count("rejected_concurrency")
+        raise HTTPException(status_code=429, detail="Too many LLM requests in flight; try again later")
+
+    def _admitted(self, waited: float):
+        with self._lock:
+            self.stats["admitted"] += 1
+            self.stats["in_flight"] += 1
+            self.stats["queue_wait_total"] += waited
+            self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], waited)
+
+    def _release(self):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent: circuit closed, a rate token and
+        a concurrency slot. Raises HTTPException (503/429) if not admitted.
+        Every successful acquire must be paired with release().
+        """
+        self._check_circuit()
+        start = time.monotonic()
+        try:
+            time.sleep(self._reserve_token())
+            remaining = self.queue_timeout - (time.monotonic() - start)
+            if not self._slots.acquire(timeout=max(0.0, remaining)):
+                self._reject_concurrency()
+        except BaseException:
+            self.breaker.cancel_probe()
+            raise
+        self._admitted(time.monotonic() - start)
+
+    async def aacquire(self):
+        """acquire() for coroutines; waits without blocking the event loop."""
+        self._check_circuit()
+        start = time.monotonic()
+        try:
+            await asyncio.sleep(self._reserve_token())
+            # Poll rather than hand the blocking acquire to a thread: a cancelled
+            # waiter (e.g. by wait_for) must never take a slot after it has gone.
+            while not self._slots.acquire(blocking=False):
+                if time.monotonic() - start >= self.queue_timeout:
+                    self._reject_concurrency()
+                await asyncio.sleep(0.05)
+        except BaseException:
+            self.breaker.cancel_probe()
+            raise
+        self._admitted(time.monotonic() - start)
+
+    def release(self):
+        self._release()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        except BaseException:
+            # The attempt ended without a verdict on the upstream (a bug, a
+            # cancelled await): free the half-open probe so the circuit
+            # cannot stay stuck rejecting every call.
+            self.breaker.cancel_probe()
+            raise
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        await self.aacquire()
+        try:
+            yield
+        except BaseException:
+            self.breaker.cancel_probe()
+            raise
+        finally:
+            self._release()
+
+    def cancel_probe(self):
+        self.breaker.cancel_probe()
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self, status_code: Optional[int] = None):
+        """
+        Counts a failed attempt. Only upstream faults (connection errors,
+        5xx) count toward opening the circuit; 429 and client errors do not.
+        """
+        self._count("failures")
+        if status_code is None or status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            # The upstream answered, so it is up.
+            self.breaker.record_success()
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in RETRYABLE_STATUSES
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Delay before retry number `attempt` (0-based): full-jitter exponential
+        backoff capped at backoff_max, but never sooner than the upstream's
+        Retry-After. The hint is not capped: retrying earlier only gets
+        throttled again.
+        """
+        self._count("retries")
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        hinted = parse_retry_after(retry_after)
+        if hinted is not None:
+            delay = max(delay, hinted)
+        return delay
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        admitted = stats["admitted"]
+        stats["queue_wait_avg"] = round(stats["queue_wait_total"] / admitted, 4) if admitted else 0.0
+        stats["queue_wait_total"] = round(stats["queue_wait_total"], 4)
+        stats["queue_wait_max"] = round(stats["queue_wait_max"], 4)
+        stats["max_concurrency"] = self.max_concurrency
+        stats["rate_limit_rps"] = self.bucket.rate
+        stats["circuit_state"] = self.breaker.state
+        return stats
+
+_governor: Optional[LLMGovernor] = None
+_governor_lock = threading.Lock()
+
+def get_governor() -> LLMGovernor:
+    """Process-wide governor built from settings."""
+    global _governor
+    if _governor is None:
+        with _governor_lock:
+            if _governor is None:
+                _governor = LLMGovernor(
+                    rate=settings.LLM_RATE_LIMIT_RPS,
+                    burst=settings.LLM_RATE_LIMIT_BURST,
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    queue_timeout=settings.LLM_QUEUE_TIMEOUT,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    backoff_base=settings.LLM_BACKOFF_BASE,
+                    backoff_max=settings.LLM_BACKOFF_MAX,
+                    breaker_threshold=settings.LLM_BREAKER_THRESHOLD,
+                    breaker_cooldown=settings.LLM_BREAKER_COOLDOWN,
+                )
+    return _governor
@@ -1,19 +1,81 @@
+import asyncio
+import json
+import threading
+import weakref
 import requests
+import httpx
 import time
+from typing import Iterator
+from requests.adapters import HTTPAdapter
 from fastapi import HTTPException
 from app.config import settings
+from app.services.llm_cache import get_cache
+from app.services.llm_governor import get_governor
 
-def call_openrouter(messages: list, model: str | None = None) -> str:
+MOCK_RESPONSE = "This is a mock response from OpenRouter (API Key missing)."
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+# One AsyncClient per event loop: httpx connections are bound to the loop
+# that opened them, and background jobs run on their own short-lived loops.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_session() -> requests.Session:
     """
-    Calls OpenRouter API with retries and graceful error handling. 
-    Returns the content of the response message.
+    Process-wide keep-alive session for sync calls, so repeated requests
+    reuse pooled TCP/TLS connections instead of reconnecting each time.
     """
-    if not settings.OPENROUTER_API_KEY:
-        # Demo mode / Mock response
-        return "This is a mock response from OpenRouter (API Key missing)."
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.OPENROUTER_POOL_SIZE
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Pooled AsyncClient for the running event loop. Uses HTTP/2 (one
+    multiplexed connection for concurrent calls) when enabled and the h2
+    package is installed.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=settings.REQUEST_TIMEOUT,
+            http2=settings.OPENROUTER_HTTP2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.OPENROUTER_POOL_SIZE,
+                max_keepalive_connections=settings.OPENROUTER_POOL_SIZE
+            )
+        )
+        _async_clients[loop] = client
+    return client
 
+async def aclose_async_client():
+    """Closes the running loop's pooled client; call before a private loop ends."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def _build_request(messages: list, model: str | None = None) -> tuple[str, dict, dict]:
+    """URL, headers and JSON payload for a chat completion request."""
     target_model = model or settings.OPENROUTER_MODEL
-    url = "https://openrouter.ai/api/v1/chat/completions"
+    url = f"{settings.OPENROUTER_BASE_URL}/chat/completions"
     
     headers = {
         "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
@@ -26,31 +88,222 @@ def call_openrouter(messages: list, model: str | None = None) -> str:
         "model": target_model,
         "messages": messages
     }
+    return url, headers, payload
+
+class MalformedResponseError(Exception):
+    """A successful HTTP response whose body holds no completion."""
+
+def _parse_content(response) -> str:
+    """
+    Message content of a chat completion response. OpenRouter can answer
+    200 with {"error": ...} instead of choices; that, and any body that is
+    not a completion, raises MalformedResponseError.
+    """
+    try:
+        return response.json()["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise MalformedResponseError(f"Malformed completion response ({type(e).__name__}: {e})") from e
+
+def _retry_delay(attempt: int, response, error: Exception) -> float | None:
+    """
+    Records a failed attempt with the governor and returns how long to back
+    off before retrying, or None if the call should give up. A malformed
+    body counts as a 502 from the upstream.
+    """
+    governor = get_governor()
+    if isinstance(error, MalformedResponseError):
+        status = 502
+    else:
+        status = response.status_code if response is not None else None
+    governor.record_failure(status)
+    if not governor.should_retry(attempt, status):
+        return None
+    return governor.backoff(attempt, response.headers.get("Retry-After") if response is not None else None)
+
+def _error_detail(e: Exception, response) -> str:
+    error_msg = f"OpenRouter API call failed: {str(e)}"
+    if response is not None and response.text:
+        error_msg += f" | Response: {response.text}"
+    return error_msg
+
+def call_openrouter(messages: list, model: str | None = None) -> str:
+    """
+    Calls OpenRouter API with retries and graceful error handling. 
+    Returns the content of the response message.
+    Every attempt is admitted by the shared LLM governor (rate limit,
+    concurrency cap, circuit breaker), which may reject it with 429/503.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        # Demo mode / Mock response
+        return MOCK_RESPONSE
+
+    url, headers, payload = _build_request(messages, model)
+    cache = get_cache()
+    if cache:
+        cached = cache.get(payload["model"], messages)
+        if cached is not None:
+            return cached
+
+    governor = get_governor()
+    attempt = 0
+    while True:
+        response = None
+        with governor.slot():
+            try:
+                response = get_session().post(
+                    url, 
+                    json=payload, 
+                    headers=headers, 
+                    timeout=settings.REQUEST_TIMEOUT
+                )
+                response.raise_for_status()
+                content = _parse_content(response)
+            except (requests.exceptions.RequestException, MalformedResponseError) as e:
+                error = e
+            else:
+                governor.record_success()
+                if cache:
+                    cache.set(payload["model"], messages, content)
+                return content
+
+        # Back off outside the concurrency slot so waiting retries don't hold it
+        delay = _retry_delay(attempt, response, error)
+        if delay is None:
+            raise HTTPException(status_code=502, detail=_error_detail(error, response))
+        time.sleep(delay)
+        attempt += 1
+
+async def acall_openrouter(messages: list, model: str | None = None) -> str:
+    """
+    Async counterpart of call_openrouter (httpx), so independent prompts can
+    be awaited concurrently. Same governor, retries, mock mode and errors.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        return MOCK_RESPONSE
+
+    url, headers, payload = _build_request(messages, model)
+    cache = get_cache()
+    if cache:
+        cached = cache.get(payload["model"], messages)
+        if cached is not None:
+            return cached
+
+    governor = get_governor()
+    client = get_async_client()
+    attempt = 0
+    while True:
+        response = None
+        async with governor.aslot():
+            try:
+                response = await client.post(url, json=payload, headers=headers)
+                response.raise_for_status()
+                content = _parse_content(response)
+            except (httpx.HTTPError, MalformedResponseError) as e:
+                error = e
+            else:
+                governor.record_success()
+                if cache:
+                    cache.set(payload["model"], messages, content)
+                return content
 
-    retries = 2
-    for attempt in range(retries + 1):
+        delay = _retry_delay(attempt, response, error)
+        if delay is None:
+            raise HTTPException(status_code=502, detail=_error_detail(error, response))
+        await asyncio.sleep(delay)
+        attempt += 1
+
+def _iter_sse_content(response: requests.Response) -> Iterator[str]:
+    """
+    Parses an OpenAI-style SSE completion stream into content deltas.
+    Comment lines (": OPENROUTER PROCESSING" keep-alives) and empty deltas
+    are skipped; "data: [DONE]" ends the stream.
+    """
+    # Decode explicitly: SSE is UTF-8, but requests would assume Latin-1
+    # for a text/event-stream response without a charset.
+    for raw_line in response.iter_lines():
+        line = raw_line.decode("utf-8")
+        if not line or line.startswith(":") or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
         try:
-            response = requests.post(
-                url, 
-                json=payload, 
-                headers=headers, 
-                timeout=settings.REQUEST_TIMEOUT
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        if "error" in chunk:
+            raise HTTPException(status_code=502, detail=f"OpenRouter stream error: {chunk['error']}")
+        choices = chunk.get("choices") or [{}]
+        delta = choices[0].get("delta", {}).get("content")
+        if delta:
+            yield delta
+
+def stream_openrouter(messages: list, model: str | None = None) -> Iterator[str]:
+    """
+    Streaming variant of call_openrouter ("stream": true). The request is
+    made and checked before returning, so connection or HTTP errors raise
+    HTTPException up front; the returned iterator then yields content
+    pieces as they arrive. The assembled completion is cached, and a cache
+    hit is yielded as a single piece.
+    """
+    if not settings.OPENROUTER_API_KEY:
+        return iter([MOCK_RESPONSE])
+
+    url, headers, payload = _build_request(messages, model)
+    cache = get_cache()
+    if cache:
+        cached = cache.get(payload["model"], messages)
+        if cached is not None:
+            return iter([cached])
+
+    payload["stream"] = True
+    governor = get_governor()
+    attempt = 0
+    while True:
+        response = None
+        governor.acquire()
+        try:
+            response = get_session().post(
+                url,
+                json=payload,
+                headers=headers,
+                timeout=settings.REQUEST_TIMEOUT,
+                stream=True
             )
             response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
-            
+            break
         except requests.exceptions.RequestException as e:
-            if attempt < retries:
-                time.sleep(1 * (attempt + 1))  # Exponential-ish backoff
-                continue
-            
-            # If it was the last attempt, raise HTTPException
-            error_msg = f"OpenRouter API call failed: {str(e)}"
-            if 'response' in locals() and hasattr(response, 'text') and response.text:
-                 error_msg += f" | Response: {response.text}"
-            
-            # Log error internally here if logger available
-            raise HTTPException(status_code=502, detail=error_msg)
-            
-    raise HTTPException(status_code=500, detail="Unknown error in calling OpenRouter API")
+            governor.release()
+            delay = _retry_delay(attempt, response, e)
+            if delay is None:
+                raise HTTPException(status_code=502, detail=f"OpenRouter API call failed: {str(e)}")
+            time.sleep(delay)
+            attempt += 1
+        except BaseException:
+            governor.cancel_probe()
+            governor.release()
+            raise
+
+    def pieces():
+        # The concurrency slot stays held until the stream is drained or closed
+        collected = []
+        try:
+            for delta in _iter_sse_content(response):
+                collected.append(delta)
+                yield delta
+        except (requests.exceptions.RequestException, HTTPException):
+            # Broken connection or an error event from the upstream
+            governor.record_failure()
+            raise
+        except BaseException:
+            # Closed early (e.g. the client went away): no verdict
+            governor.cancel_probe()
+            raise
+        finally:
+            response.close()
+            governor.release()
+        governor.record_success()
+        if cache:
+            cache.set(payload["model"], messages, "".join(collected))
+
+    return pieces()
@@ -0,0 +1,18 @@
+from fastapi import Response
+from sqlalchemy.orm import Query
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_PAGE_HEADER = "X-Next-After-Id"
+
+def keyset_page(query: Query, id_column, limit: int, after_id: int | None, response: Response) -> list:
+    """
+    One page of a listing, newest first (descending id). Pages are selected
+    with `id < after_id` over the primary key index rather than OFFSET, so
+    every page costs the same however deep the client has scrolled.
+    """
+    if after_id is not None:
+        query = query.filter(id_column < after_id)
+    rows = query.order_by(id_column.desc()).limit(limit).all()
+    if len(rows) == limit:
+        response.headers[NEXT_PAGE_HEADER] = str(rows[-1].id)
+    return rows
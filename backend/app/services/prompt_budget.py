@@ -0,0 +1,211 @@
+import math
+import re
+import threading
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from app.config import settings
+from app.utils.skills import extract_skills
+
+# Rough tokens-per-character ratio for English prose with BPE tokenizers.
+# Only used to decide what fits, so an estimate is enough.
+CHARS_PER_TOKEN = 4
+
+# Lines longer than this (PDFs often extract whole paragraphs as one line)
+# are split at bullets and sentence ends before selection.
+MAX_LINE_CHARS = 300
+
+SECTION_HEADINGS = {
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tools", "tech stack"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "certifications": ("certifications", "certificates", "licenses", "courses"),
+    "summary": ("summary", "professional summary", "profile", "objective", "career objective",
+                "about me"),
+    "other": ("achievements", "awards", "publications", "languages", "interests", "hobbies",
+              "additional information", "volunteering"),
+}
+_HEADING_TO_SECTION = {h: name for name, headings in SECTION_HEADINGS.items() for h in headings}
+
+# Sections kept whole while they fit; experience/projects/other lines
+# compete on relevance for the remaining budget.
+ESSENTIAL_SECTIONS = {"header", "summary", "skills", "education", "certifications"}
+
+_BULLET_CHARS = "•●▪◦‣*-–"
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.;!?])\s+(?=[A-Z0-9])|\s*[•●▪◦‣]\s*")
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+def get_model_budget(model: str | None = None) -> int:
+    """Token budget for the resume + JD text of one prompt to `model`."""
+    target_model = model or settings.OPENROUTER_MODEL
+    return settings.LLM_MODEL_TOKEN_BUDGETS.get(target_model, settings.LLM_PROMPT_TOKEN_BUDGET)
+
+def _split_lines(text: str) -> list[str]:
+    lines = []
+    for line in (text or "").splitlines():
+        line = line.rstrip()
+        if len(line) > MAX_LINE_CHARS:
+            lines.extend(piece for piece in _SENTENCE_SPLIT.split(line) if piece.strip())
+        else:
+            lines.append(line)
+    return lines
+
+def _terms(text: str) -> set[str]:
+    """Lowercased content words of a line (stop words and 1-2 letter words dropped)."""
+    return {t for t in _TERM_RE.findall(text.lower()) if len(t) > 2 and t not in ENGLISH_STOP_WORDS}
+
+def _heading_section(line: str) -> str | None:
+    normalized = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    if not normalized or len(normalized) > 40:
+        return None
+    return _HEADING_TO_SECTION.get(normalized)
+
+def split_sections(text: str) -> list[tuple[str, list[str]]]:
+    """
+    Splits resume text into (section, lines) runs at recognised headings
+    ("EXPERIENCE", "Technical Skills:", ...). Text before the first heading
+    is the "header" section; each heading line leads its own section.
+    """
+    sections = [("header", [])]
+    for line in _split_lines(text):
+        section = _heading_section(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+def _select_lines(candidates: list[tuple[int, float, int, str]], budget: int) -> set[int]:
+    """
+    Greedy fill: candidates are (tier, score, position, line); lower tiers
+    first, then higher scores, then earlier lines. Returns kept positions.
+    """
+    kept = set()
+    seen = set()
+    used = 0
+    for tier, score, position, line in sorted(candidates, key=lambda c: (c[0], -c[1], c[2])):
+        # Repeated lines (boilerplate, PDF headers/footers) only cost once
+        key = line.strip().lower()
+        if key in seen:
+            continue
+        cost = estimate_tokens(line) + 1
+        if used + cost <= budget:
+            kept.add(position)
+            seen.add(key)
+            used += cost
+    return kept
+
+def fit_resume(resume_text: str, budget: int, missing_skills: list[str], jd_terms: set[str]) -> str:
+    """
+    Shrinks a resume to roughly `budget` tokens. Header, summary, skills,
+    education and certifications are kept first; experience and project
+    lines are then ranked by how many missing skills (weighted 3x) and JD
+    terms they mention, with the earliest (most recent) lines winning
+    ties. The kept lines are returned in their original order.
+    """
+    if estimate_tokens(resume_text) <= budget:
+        return resume_text
+
+    missing = [_terms(skill) for skill in missing_skills or []]
+    missing = [terms for terms in missing if terms]
+    entries = [
+        (section, i == 0 and section != "header", line)
+        for section, lines in split_sections(resume_text)
+        for i, line in enumerate(lines)
+    ]
+    candidates = []
+    for position, (section, is_heading, line) in enumerate(entries):
+        if not line.strip():
+            continue
+        if is_heading or section in ESSENTIAL_SECTIONS:
+            tier, score = 0, 0
+        else:
+            terms = _terms(line)
+            score = 3 * sum(1 for skill in missing if skill <= terms) + len(terms & jd_terms)
+            is_anchor = not line.lstrip().startswith(tuple(_BULLET_CHARS)) and len(line) <= 100
+            # Role/company lines give the kept bullets their context
+            tier = 1 if score or is_anchor else 2
+        candidates.append((tier, score, position, line))
+
+    kept = _select_lines(candidates, budget)
+
+    # Drop headings whose section lost all of its content
+    heading = None
+    has_content = False
+    for position, (_, is_heading, _) in enumerate(entries + [(None, True, "")]):
+        if is_heading:
+            if heading is not None and heading in kept and not has_content:
+                kept.discard(heading)
+            heading, has_content = position, False
+        elif position in kept:
+            has_content = True
+
+    return "\n".join(line for position, (_, _, line) in enumerate(entries) if position in kept)
+
+def fit_jd(jd_text: str, budget: int) -> str:
+    """Shrinks a JD to roughly `budget` tokens, preferring lines that name skills."""
+    if estimate_tokens(jd_text) <= budget:
+        return jd_text
+    lines = _split_lines(jd_text)
+    candidates = []
+    for position, line in enumerate(lines):
+        if line.strip():
+            score = len(extract_skills(line))
+            candidates.append((0 if score else 1, score, position, line))
+    kept = _select_lines(candidates, budget)
+    return "\n".join(line for pos, line in enumerate(lines) if pos in kept)
+
+_stats = {"calls": 0, "trimmed_calls": 0, "original_tokens": 0, "prompt_tokens": 0, "tokens_saved": 0}
+_stats_lock = threading.Lock()
+
+def fit_inputs(resume_text: str, jd_text: str, missing_skills: list[str] | None = None,
+               model: str | None = None) -> dict:
+    """
+    Fits the resume and JD of one prompt into the model's token budget.
+    The JD may use up to LLM_JD_BUDGET_SHARE of it (more if the resume is
+    short); the resume gets the rest. Texts already within budget pass
+    through unchanged.
+    Returns {"resume_text", "jd_text", "original_tokens", "prompt_tokens",
+    "tokens_saved"}.
+    """
+    resume_text = resume_text or ""
+    jd_text = jd_text or ""
+    budget = get_model_budget(model)
+    resume_tokens = estimate_tokens(resume_text)
+    jd_tokens = estimate_tokens(jd_text)
+    original_tokens = resume_tokens + jd_tokens
+
+    if original_tokens > budget:
+        jd_budget = max(int(budget * settings.LLM_JD_BUDGET_SHARE), budget - resume_tokens)
+        jd_text = fit_jd(jd_text, jd_budget)
+        resume_text = fit_resume(
+            resume_text,
+            budget - estimate_tokens(jd_text),
+            missing_skills or [],
+            _terms(jd_text)
+        )
+
+    prompt_tokens = estimate_tokens(resume_text) + estimate_tokens(jd_text)
+    saved = original_tokens - prompt_tokens
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["trimmed_calls"] += 1 if saved else 0
+        _stats["original_tokens"] += original_tokens
+        _stats["prompt_tokens"] += prompt_tokens
+        _stats["tokens_saved"] += saved
+
+    return {
+        "resume_text": resume_text,
+        "jd_text": jd_text,
+        "original_tokens": original_tokens,
+        "prompt_tokens": prompt_tokens,
+        "tokens_saved": saved,
+    }
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
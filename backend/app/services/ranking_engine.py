@@ -1,56 +1,367 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import heapq
+import multiprocessing
+import os
+import threading
+import numpy as np
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, undefer
+from app.config import settings
 from app.models.resume import Resume
 from app.models.job_description import JobDescription
-from app.utils.skills import extract_skills
-from app.services import ats_engine
+from app.services import corpus_model, feature_store, score_cache, scoring
 
-def rank_resumes(jd: JobDescription, resumes: List[Resume]) -> List[Dict[str, Any]]:
+def score_shard(
+    jd_features: dict,
+    candidate_features: List[Optional[dict]],
+    texts: List[Optional[str]],
+    similarity_scores: np.ndarray,
+    weights: Optional[Dict[str, float]] = None
+) -> Tuple[Dict[str, np.ndarray], Dict[int, dict]]:
     """
-    Computes ATS scores for a list of resumes against a JD and returns them ranked.
+    Scores one shard of candidates with the scoring pipeline for weights;
+    also the worker entry point for the scoring pool. Candidates without
+    usable cached features are passed as None plus their text and
+    extracted here. Returns the sub-score arrays (plus "final") and the
+    newly extracted features keyed by position in the shard.
+    """
+    candidate_features = list(candidate_features)
+    extracted = {}
+    for i, features in enumerate(candidate_features):
+        if features is None:
+            candidate_features[i] = extracted[i] = feature_store.extract_features(texts[i])
+    pipeline = scoring.get_pipeline(weights)
+    return pipeline.score(jd_features, candidate_features, similarity_scores), extracted
+
+_scoring_pool: Optional[ProcessPoolExecutor] = None
+_scoring_pool_lock = threading.Lock()
+
+def _scoring_workers() -> int:
+    return settings.RANKING_WORKERS or os.cpu_count() or 1
+
+def get_scoring_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by all ranking requests, created on first use.
+    Workers are spawned rather than forked so they never inherit the
+    server's threads or open DB connections.
+    """
+    global _scoring_pool
+    with _scoring_pool_lock:
+        if _scoring_pool is None:
+            _scoring_pool = ProcessPoolExecutor(
+                max_workers=_scoring_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _scoring_pool
+
+def score_features(
+    jd_features: dict,
+    candidate_features: List[Optional[dict]],
+    texts: List[Optional[str]],
+    similarity_scores: np.ndarray,
+    weights: Optional[Dict[str, float]] = None
+) -> Tuple[Dict[str, np.ndarray], Dict[int, dict]]:
+    """
+    Same contract as score_shard, but pools of RANKING_PARALLEL_THRESHOLD
+    candidates or more are split into contiguous shards scored across the
+    process pool. Only plain feature dicts, the texts that still need
+    parsing and similarity slices are shipped to workers. Shards are merged
+    back in input order, so results are identical to the in-process path.
+    """
+    n = len(candidate_features)
+    workers = _scoring_workers()
+    if workers <= 1 or n < settings.RANKING_PARALLEL_THRESHOLD:
+        return score_shard(jd_features, candidate_features, texts, similarity_scores, weights)
+
+    similarity_scores = np.asarray(similarity_scores, dtype=np.float64)
+    bounds = np.linspace(0, n, workers + 1).astype(int)
+    shards = [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+    pool = get_scoring_pool()
+    futures = [
+        pool.submit(
+            score_shard, jd_features,
+            candidate_features[start:end], texts[start:end], similarity_scores[start:end], weights
+        )
+        for start, end in shards
+    ]
+
+    shard_scores = []
+    extracted = {}
+    for (start, _), future in zip(shards, futures):
+        scores, shard_extracted = future.result()
+        shard_scores.append(scores)
+        extracted.update({start + i: f for i, f in shard_extracted.items()})
+
+    merged = {key: np.concatenate([s[key] for s in shard_scores]) for key in shard_scores[0]}
+    return merged, extracted
+
+def top_k_indices(scores: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first. Ties keep input order so
+    the ranking is deterministic (matches a stable descending sort).
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        candidates = np.arange(n)
+    elif k <= 0:
+        return np.empty(0, dtype=np.int64)
+    else:
+        # Everything strictly above the k-th best score, topped up with the
+        # earliest ties at the cutoff.
+        cutoff = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > cutoff)
+        ties = np.flatnonzero(scores == cutoff)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order]
+
+def _load_deferred(db: Session, resumes: List[Resume]):
+    """
+    Fills in text, term vectors and features the caller deferred when
+    loading these rows, in one query instead of a lazy load per row.
+    """
+    if resumes:
+        db.query(Resume).options(
+            undefer(Resume.resume_text), undefer(Resume.term_vector), undefer(Resume.features)
+        ).filter(Resume.id.in_([r.id for r in resumes])).all()
+
+def jd_weights(jd: JobDescription, weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """The JD's weight profile with one-off overrides layered on top."""
+    return {**(jd.scoring_weights or {}), **(weights or {})}
+
+def score_resumes(
+    jd: JobDescription,
+    resumes: List[Resume],
+    db: Optional[Session] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> Dict[str, np.ndarray]:
     """
-    ranked_results = []
-    
-    jd_skills = extract_skills(jd.jd_text or "")
-    jd_exp = ats_engine.extract_years_of_experience(jd.jd_text or "")
-    
-    for resume in resumes:
-        resume_text = resume.resume_text or ""
-        resume_skills = extract_skills(resume_text)
-        
-        # specific extraction for this resume
-        resume_exp = ats_engine.extract_years_of_experience(resume_text)
-        
-        # Compute scores
-        skill_match_score = ats_engine.compute_skill_match(resume_skills, jd_skills)
-        similarity_score = ats_engine.compute_similarity_score(resume_text, jd.jd_text or "")
-        exp_score = ats_engine.compute_experience_score(resume_exp, jd_exp)
-        edu_score = ats_engine.compute_education_score(resume_text, jd.jd_text or "")
-        
-        final_score = ats_engine.compute_final_ats_score(
-            skill_match_score, similarity_score, exp_score, edu_score
+    Sub-score arrays plus "final" for resumes against a JD, in input order.
+    Final scores use the JD's weight profile, with weights layered on top.
+    With a db session, sub-scores are read from and written to the score
+    cache: only candidates whose text, features or scorers changed since
+    they were last scored against this JD are re-scored (new weights only
+    recombine cached sub-scores), and the heavy columns (text, term vector,
+    features) may be deferred by the caller: they are loaded in bulk for
+    re-scored candidates only. The caller commits.
+    """
+    jd_features = feature_store.get_features(jd, jd.jd_text)
+    profile = jd_weights(jd, weights)
+    pipeline = scoring.get_pipeline(profile)
+
+    keys = {}
+    cached = {}
+    if db is not None:
+        # Rows stored before text hashing need their text to get a key
+        _load_deferred(db, [r for r in resumes if r.text_hash is None])
+        jd_text_hash = score_cache.jd_hash(jd)
+        keys = {r.id: score_cache.score_key(score_cache.resume_hash(r), jd_text_hash) for r in resumes}
+        cached = score_cache.lookup(db, jd.id, keys)
+
+    scores = {name: np.empty(len(resumes)) for name in scoring.SCORERS}
+    for i, r in enumerate(resumes):
+        if r.id in cached:
+            for name, value in cached[r.id].items():
+                scores[name][i] = value
+
+    misses = [i for i, r in enumerate(resumes) if r.id not in cached]
+    if misses:
+        miss_resumes = [resumes[i] for i in misses]
+        if db is not None:
+            _load_deferred(db, miss_resumes)
+
+        # Cached term vectors + corpus IDF: one sparse product for the whole pool
+        similarity_scores = corpus_model.get_model().similarities(
+            corpus_model.document_vectors(miss_resumes, [r.resume_text for r in miss_resumes]),
+            corpus_model.document_vectors([jd], [jd.jd_text])
         )
-        
-        # Helpers for response
-        resume_skills_set = set(s.lower() for s in resume_skills)
-        jd_skills_set = set(s.lower() for s in jd_skills)
-        
-        matched_skills = list(resume_skills_set.intersection(jd_skills_set))
-        missing_skills = list(jd_skills_set - resume_skills_set)
-        
-        ranked_results.append({
-            "resume_id": resume.id,
-            "filename": resume.filename,
-            "ats_score": final_score,
-            "matched_skills": matched_skills,
-            "missing_skills": missing_skills,
-            "years_exp": resume_exp
+
+        # Cached at upload; only missing or stale rows ship their text to be re-extracted
+        stale = [feature_store.is_stale(r) for r in miss_resumes]
+        miss_scores, extracted = score_features(
+            jd_features,
+            [None if is_stale else r.features for r, is_stale in zip(miss_resumes, stale)],
+            [r.resume_text if is_stale else None for r, is_stale in zip(miss_resumes, stale)],
+            similarity_scores,
+            profile
+        )
+        for i, features in extracted.items():
+            feature_store.store_features(miss_resumes[i], features)
+        for name in scoring.SCORERS:
+            scores[name][misses] = miss_scores[name]
+        if db is not None:
+            score_cache.store(db, jd.id, [r.id for r in miss_resumes], keys, miss_scores)
+
+    scores["final"] = pipeline.combine(scores)
+    return scores
+
+def ranked_results(
+    jd: JobDescription,
+    resumes: List[Resume],
+    scores: Dict[str, np.ndarray],
+    top: np.ndarray,
+    db: Optional[Session] = None
+) -> List[Dict[str, Any]]:
+    """
+    Result entries for the candidates at indices top (best first), with
+    skill breakdowns and sub-scores. Features deferred by the caller are
+    loaded for these rows only.
+    """
+    if db is not None:
+        _load_deferred(db, [resumes[i] for i in top if "features" in inspect(resumes[i]).unloaded])
+
+    jd_skills_set = set(feature_store.get_features(jd, jd.jd_text)["skills"])
+    results = []
+    for position, i in enumerate(top, start=1):
+        features = resumes[i].features
+        resume_skills_set = set(features["skills"])
+        results.append({
+            "resume_id": resumes[i].id,
+            "filename": resumes[i].filename,
+            "ats_score": float(scores["final"][i]),
+            "scores": {name: float(scores[name][i]) for name in scoring.SCORERS},
+            "matched_skills": sorted(resume_skills_set & jd_skills_set),
+            "missing_skills": sorted(jd_skills_set - resume_skills_set),
+            "years_exp": features["years_exp"],
+            "rank_position": position
         })
-        
-    # Sort by ATS Score descending
-    ranked_results.sort(key=lambda x: x["ats_score"], reverse=True)
-    
-    # Add rank position
-    for i, res in enumerate(ranked_results):
-        res["rank_position"] = i + 1
-        
-    return ranked_results
+    return results
+
+def rank_resumes(
+    jd: JobDescription,
+    resumes: List[Resume],
+    top_k: Optional[int] = None,
+    db: Optional[Session] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Computes ATS scores for a list of resumes against a JD and returns them ranked.
+    Only the top_k best candidates are returned when top_k is given.
+    See score_resumes for weights and the score cache.
+    """
+    scores = score_resumes(jd, resumes, db=db, weights=weights)
+    # Skill breakdowns are only built for the candidates actually returned
+    return ranked_results(jd, resumes, scores, top_k_indices(scores["final"], top_k), db)
+
+def stream_rank_pool(
+    db: Session,
+    jd: JobDescription,
+    top_k: int = 50,
+    chunk_size: int = 1000,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Ranks every stored resume (optionally filtered) against a JD without
+    loading the pool into memory. Rows are streamed in chunks as plain
+    column tuples (no ORM objects, no resume_text), each chunk is scored
+    with the columnar kernel, and only a bounded heap of the best top_k
+    survives between chunks.
+
+    Yields progress events while scoring and the ranked results at the end:
+    {"type": "start", "total"}, {"type": "progress", "scored"} per chunk,
+    {"type": "result", ...rank_resumes fields} per candidate, {"type": "done"}.
+    Stale features / missing term vectors are computed on the fly but not
+    written back here; the regular analysis and ranking paths persist them.
+    Weights are layered over the JD's profile, as in rank_resumes.
+    """
+    jd_features = feature_store.get_features(jd, jd.jd_text)
+    profile = jd_weights(jd, weights)
+    jd_counts = corpus_model.document_vectors([jd], [jd.jd_text])
+    jd_skills_set = set(jd_features["skills"])
+    model = corpus_model.get_model()
+
+    filters = []
+    if created_after is not None:
+        filters.append(Resume.created_at >= created_after)
+    if created_before is not None:
+        filters.append(Resume.created_at < created_before)
+    if user_id is not None:
+        filters.append(Resume.user_id == user_id)
+
+    total = db.query(Resume.id).filter(*filters).count()
+    yield {"type": "start", "total": total}
+
+    rows_query = (
+        db.query(
+            Resume.id, Resume.filename, Resume.features,
+            Resume.features_version, Resume.term_vector
+        )
+        .filter(*filters)
+        .order_by(Resume.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    # Min-heap of (score, -seq, ...): heap[0] is the current worst kept
+    # candidate; -seq makes earlier rows win ties, like rank_resumes.
+    heap = []
+    scored = 0
+    chunk = []
+
+    def score_chunk(rows):
+        stale_ids = [r.id for r in rows if feature_store.is_stale(r) or r.term_vector is None]
+        texts = {}
+        if stale_ids:
+            texts = dict(db.query(Resume.id, Resume.resume_text).filter(Resume.id.in_(stale_ids)).all())
+
+        vectors = []
+        for r in rows:
+            if r.term_vector is None:
+                vectors.append(corpus_model.encode_vector(corpus_model.term_counts([texts.get(r.id, "")])[0]))
+            else:
+                vectors.append(r.term_vector)
+
+        similarity_scores = model.similarities(corpus_model.decode_vectors(vectors), jd_counts)
+        stale = [feature_store.is_stale(r) for r in rows]
+        scores, extracted = score_features(
+            jd_features,
+            [None if is_stale else r.features for r, is_stale in zip(rows, stale)],
+            [texts.get(r.id, "") if is_stale else None for r, is_stale in zip(rows, stale)],
+            similarity_scores,
+            profile
+        )
+        final_scores = scores["final"]
+        features = [extracted.get(i, r.features) for i, r in enumerate(rows)]
+
+        # Only a chunk's own top_k can possibly enter the global top_k
+        for i in top_k_indices(final_scores, top_k):
+            sub_scores = {name: float(scores[name][i]) for name in scoring.SCORERS}
+            entry = (float(final_scores[i]), -(scored + i), rows[i].id, rows[i].filename, features[i], sub_scores)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    for row in rows_query:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            score_chunk(chunk)
+            scored += len(chunk)
+            chunk = []
+            yield {"type": "progress", "scored": scored}
+    if chunk:
+        score_chunk(chunk)
+        scored += len(chunk)
+        yield {"type": "progress", "scored": scored}
+
+    ranked = sorted(heap, key=lambda e: (-e[0], -e[1]))
+    for position, (score, _, resume_id, filename, features, sub_scores) in enumerate(ranked, start=1):
+        resume_skills_set = set(features["skills"])
+        yield {
+            "type": "result",
+            "resume_id": resume_id,
+            "filename": filename,
+            "ats_score": score,
+            "scores": sub_scores,
+            "matched_skills": sorted(resume_skills_set & jd_skills_set),
+            "missing_skills": sorted(jd_skills_set - resume_skills_set),
+            "years_exp": features["years_exp"],
+            "rank_position": position
+        }
+
+    yield {"type": "done", "scored": scored}
@@ -0,0 +1,77 @@
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.ranking import Ranking
+
+def bulk_upsert(db: Session, model, key_columns: List[str], rows: List[Dict[str, Any]]):
+    """
+    INSERT ... ON CONFLICT (key_columns) DO UPDATE of every other column in
+    rows, executed with all rows as parameters so SQLAlchemy batches them
+    into multi-row VALUES instead of issuing a SELECT and an INSERT/UPDATE
+    per row. The caller commits.
+    """
+    if not rows:
+        return
+
+    update_columns = [c for c in rows[0] if c not in key_columns]
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model)
+    else:
+        # No portable upsert; fall back to per-row merge on the unique key
+        for row in rows:
+            existing = db.query(model).filter_by(**{c: row[c] for c in key_columns}).first()
+            if existing:
+                for c in update_columns:
+                    setattr(existing, c, row[c])
+            else:
+                db.add(model(**row))
+        return
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[getattr(model, c) for c in key_columns],
+        set_={c: getattr(stmt.excluded, c) for c in update_columns}
+    )
+    db.execute(stmt, rows)
+
+# Sub-score columns on Ranking, named after the scorers that produce them
+SCORE_COLUMNS = ("skill_match", "similarity", "experience", "education")
+
+def replace_rankings(db: Session, jd_id: int, results: List[Dict[str, Any]]):
+    """
+    Replaces a JD's stored ranking with ranked results and their sub-scores:
+    the previous run's rows are deleted, then the new ones written in a
+    single bulk upsert on (jd_id, resume_id). The caller commits, so readers
+    see either run whole.
+    """
+    db.query(Ranking).filter(Ranking.jd_id == jd_id).delete(synchronize_session=False)
+    rows = [
+        {
+            "jd_id": jd_id,
+            "resume_id": res["resume_id"],
+            "score": res["ats_score"],
+            "rank_position": res["rank_position"],
+            **{c: res.get("scores", {}).get(c) for c in SCORE_COLUMNS}
+        }
+        for res in results
+    ]
+    bulk_upsert(db, Ranking, ["jd_id", "resume_id"], rows)
+
+def load_score_columns(db: Session, jd_id: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Resume ids and stored sub-score columns of every candidate in a JD's
+    latest ranking, as arrays (one query, plain tuples). Rows from before sub-scores
+    were stored are skipped.
+    """
+    rows = db.query(Ranking.resume_id, *(getattr(Ranking, c) for c in SCORE_COLUMNS)).filter(
+        Ranking.jd_id == jd_id, Ranking.skill_match.isnot(None)
+    ).order_by(Ranking.rank_position, Ranking.resume_id).all()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), {c: np.empty(0) for c in SCORE_COLUMNS}
+    # Plain tuples first: numpy converts SQLAlchemy Row objects element by element
+    table = np.array([tuple(row) for row in rows], dtype=np.float64)
+    return table[:, 0].astype(np.int64), {c: table[:, i + 1] for i, c in enumerate(SCORE_COLUMNS)}
@@ -0,0 +1,59 @@
+import hashlib
+from typing import Dict, Iterable, List
+from sqlalchemy.orm import Session
+from app.models.score_cache import ScoreCache
+from app.services import dedupe, feature_store, ranking_store, scoring
+
+def resume_hash(resume) -> str:
+    """
+    Normalized-text hash of a resume. Rows stored before hashing existed
+    get it computed and attached here; the caller commits.
+    """
+    if resume.text_hash is None:
+        resume.text_hash = dedupe.text_hash(resume.resume_text)
+    return resume.text_hash or ""
+
+def jd_hash(jd) -> str:
+    return dedupe.text_hash(jd.jd_text) or ""
+
+def score_key(resume_text_hash: str, jd_text_hash: str, version: str = "") -> str:
+    """
+    Cache key of a (resume, JD) score: changes when either text is edited,
+    when features are re-versioned or when the set of scorers changes.
+    Cached sub-scores do not depend on weights (the final score is
+    recombined on every read); callers caching a final score pass the
+    pipeline version as well. Similarity is kept as scored, so later
+    shifts in corpus IDF do not invalidate it.
+    """
+    parts = [resume_text_hash, jd_text_hash, feature_store.FEATURES_VERSION, scoring.scorers_version(), version]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+def lookup(db: Session, jd_id: int, keys: Dict[int, str]) -> Dict[int, dict]:
+    """
+    Cached sub-scores keyed by resume id, for the resumes in keys
+    (resume id -> current score_key) whose stored key still matches.
+    One query; plain column tuples, no ORM objects.
+    """
+    if not keys:
+        return {}
+    rows = db.query(ScoreCache.resume_id, ScoreCache.cache_key, ScoreCache.scores).filter(
+        ScoreCache.jd_id == jd_id, ScoreCache.resume_id.in_(keys.keys())
+    )
+    return {resume_id: scores for resume_id, key, scores in rows if keys.get(resume_id) == key}
+
+def store(db: Session, jd_id: int, resume_ids: Iterable[int], keys: Dict[int, str], sub_scores: Dict[str, List[float]]):
+    """
+    Writes freshly computed sub-scores (columns in resume_ids order) in one
+    bulk upsert on (jd_id, resume_id). The caller commits.
+    """
+    columns = {name: [float(v) for v in sub_scores[name]] for name in scoring.SCORERS}
+    rows = [
+        {
+            "jd_id": jd_id,
+            "resume_id": resume_id,
+            "cache_key": keys[resume_id],
+            "scores": {name: values[i] for name, values in columns.items()}
+        }
+        for i, resume_id in enumerate(resume_ids)
+    ]
+    ranking_store.bulk_upsert(db, ScoreCache, ["jd_id", "resume_id"], rows)
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import math
+import threading
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from scipy import sparse
+from app.config import settings
+from app.utils.skills import MASTER_SKILLS
+
+# Bump whenever a scorer's formula changes output; cached sub-scores are keyed by it.
+SCORER_VERSION = 1
+
+# Column index of every known skill in the candidate skill matrix
+SKILL_INDEX = {skill: i for i, skill in enumerate(sorted(MASTER_SKILLS))}
+
+def build_skill_matrix(skill_lists: List[List[str]]) -> sparse.csr_matrix:
+    """
+    Encodes candidates' skills as a binary sparse matrix over the master
+    skill vocabulary (one row per candidate).
+    """
+    indptr = [0]
+    indices = []
+    for skills in skill_lists:
+        cols = {SKILL_INDEX[s] for s in skills if s in SKILL_INDEX}
+        indices.extend(cols)
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix(
+        (data, np.array(indices, dtype=np.int32), np.array(indptr)),
+        shape=(len(skill_lists), len(SKILL_INDEX))
+    )
+
+def round_scores(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds to 2 decimals exactly like Python's round(x, 2), which stored
+    scores have always been rounded with. np.round rescales by 100 first,
+    so it can disagree with round() on values sitting on a half-cent; only
+    those are re-rounded in Python.
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(v, 2) for v in values[near_half].tolist()]
+    return rounded
+
+class CandidateBatch:
+    """
+    Columns of a candidate pool that scorers read. Each column is built
+    once, on first use, and shared by every scorer in the pipeline.
+    """
+
+    def __init__(self, features: List[dict], similarity: np.ndarray):
+        self.features = features
+        self.similarity = np.asarray(similarity, dtype=np.float64)
+        self.size = len(features)
+
+    @cached_property
+    def skill_matrix(self) -> sparse.csr_matrix:
+        return build_skill_matrix([f["skills"] for f in self.features])
+
+    @cached_property
+    def has_skills(self) -> np.ndarray:
+        return np.array([bool(f["skills"]) for f in self.features], dtype=bool)
+
+    @cached_property
+    def years(self) -> np.ndarray:
+        return np.array([f["years_exp"] for f in self.features], dtype=np.float64)
+
+    @cached_property
+    def education_levels(self) -> np.ndarray:
+        return np.array([f["education_level"] for f in self.features], dtype=np.float64)
+
+# name -> scorer(jd_features, batch) returning one 0-100 score per candidate.
+# Registration order is the order sub-scores are summed in.
+SCORERS: Dict[str, Callable[[dict, CandidateBatch], np.ndarray]] = {}
+
+def register_scorer(name: str):
+    """Decorator registering a sub-score; give it a weight in a profile to use it."""
+    def decorator(func):
+        SCORERS[name] = func
+        return func
+    return decorator
+
+@register_scorer("skill_match")
+def score_skill_match(jd_features: dict, batch: CandidateBatch) -> np.ndarray:
+    """Share of JD skills present in each resume."""
+    jd_skills = set(jd_features["skills"])
+    if not jd_skills:
+        # Edge case: no skills required
+        return np.where(batch.has_skills, 0.0, 100.0)
+    jd_cols = [SKILL_INDEX[s] for s in jd_skills if s in SKILL_INDEX]
+    matched = np.asarray(batch.skill_matrix[:, jd_cols].sum(axis=1), dtype=np.float64).ravel()
+    return round_scores((matched / len(jd_skills)) * 100)
+
+@register_scorer("similarity")
+def score_similarity(jd_features: dict, batch: CandidateBatch) -> np.ndarray:
+    """Corpus TF-IDF cosine, computed by the caller (see corpus_model)."""
+    return batch.similarity
+
+@register_scorer("experience")
+def score_experience(jd_features: dict, batch: CandidateBatch) -> np.ndarray:
+    """Full marks at or above the JD requirement, else proportional."""
+    jd_years = float(jd_features["years_exp"])
+    if jd_years <= 0:
+        return np.full(batch.size, 100.0)
+    return np.where(batch.years >= jd_years, 100.0, round_scores((batch.years / jd_years) * 100))
+
+@register_scorer("education")
+def score_education(jd_features: dict, batch: CandidateBatch) -> np.ndarray:
+    """Same rule as experience, over degree levels."""
+    jd_level = float(jd_features["education_level"])
+    if jd_level == 0:
+        return np.full(batch.size, 100.0)
+    return np.where(batch.education_levels >= jd_level, 100.0, round_scores((batch.education_levels / jd_level) * 100))
+
+# Profile used when neither SCORING_WEIGHTS nor the JD set a weight
+DEFAULT_WEIGHTS = {"skill_match": 0.50, "similarity": 0.25, "experience": 0.15, "education": 0.10}
+
+def scorers_version() -> str:
+    """
+    Version of the sub-scores: SCORER_VERSION plus the registered scorer
+    names. Weights are not part of it; final scores are recombined.
+    """
+    return f"{SCORER_VERSION}-{'.'.join(SCORERS)}"
+
+def resolve_weights(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Full weight profile: DEFAULT_WEIGHTS, then the deployment-wide
+    SCORING_WEIGHTS, then overrides (e.g. a JD's profile). Weights are
+    relative; combine() divides by their sum. Raises ValueError on unknown
+    scorers, NaN/infinite or negative weights, or an all-zero profile.
+    """
+    weights = {name: 0.0 for name in SCORERS}
+    for layer in (DEFAULT_WEIGHTS, settings.SCORING_WEIGHTS, overrides or {}):
+        for name, weight in layer.items():
+            if name not in SCORERS:
+                raise ValueError(f"Unknown scorer '{name}'; available: {', '.join(SCORERS)}")
+            if not math.isfinite(weight):
+                raise ValueError(f"Weight for '{name}' must be a finite number")
+            if weight < 0:
+                raise ValueError(f"Weight for '{name}' must not be negative")
+            weights[name] = float(weight)
+    if not any(weights.values()):
+        raise ValueError("At least one weight must be positive")
+    return weights
+
+class ScoringPipeline:
+    """
+    Every registered scorer evaluated over a whole candidate batch (one
+    array each), plus their weighted sum as "final". Shared by
+    /analysis/run (a batch of one) and ranking, so both always agree.
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self.version = hashlib.sha256(
+            json.dumps([scorers_version(), weights], sort_keys=True).encode("utf-8")
+        ).hexdigest()[:12]
+
+    def sub_scores(self, jd_features: dict, candidate_features: List[dict], similarity_scores: np.ndarray) -> Dict[str, np.ndarray]:
+        batch = CandidateBatch(candidate_features, similarity_scores)
+        return {name: scorer(jd_features, batch) for name, scorer in SCORERS.items()}
+
+    def combine(self, sub_scores: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Weighted mean of the sub-scores over whole columns, so the final
+        score stays on the 0-100 scale whatever the profile. Summed in
+        registration order, and a profile already summing to 1 (like the
+        default) is not divided, so its floats stay exactly as before.
+        """
+        total = None
+        for name in SCORERS:
+            term = np.asarray(sub_scores[name], dtype=np.float64) * self.weights[name]
+            total = term if total is None else total + term
+        weight_sum = sum(self.weights[name] for name in SCORERS)
+        if weight_sum != 1:
+            total = total / weight_sum
+        return round_scores(total)
+
+    def score(self, jd_features: dict, candidate_features: List[dict], similarity_scores: np.ndarray) -> Dict[str, np.ndarray]:
+        """One array per sub-score plus the weighted "final"."""
+        scores = self.sub_scores(jd_features, candidate_features, similarity_scores)
+        scores["final"] = self.combine(scores)
+        return scores
+
+_pipelines: Dict[str, ScoringPipeline] = {}
+_pipelines_lock = threading.Lock()
+
+def get_pipeline(overrides: Optional[Dict[str, float]] = None) -> ScoringPipeline:
+    """
+    Pipeline for a weight profile (see resolve_weights), built once per
+    distinct profile and reused across requests.
+    """
+    weights = resolve_weights(overrides)
+    cache_key = json.dumps(weights, sort_keys=True)
+    pipeline = _pipelines.get(cache_key)
+    if pipeline is None:
+        with _pipelines_lock:
+            pipeline = _pipelines.setdefault(cache_key, ScoringPipeline(weights))
+    return pipeline
@@ -0,0 +1,325 @@
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session, load_only
+from app.config import settings
+from app.models.resume import Resume
+from app.models.resume_skill import ResumeSkill, NO_SKILLS, posting_rows
+from app.services import feature_store
+from app.services.ranking_engine import top_k_indices
+from app.services.scoring import round_scores
+from app.utils.skills import MASTER_SKILLS, SYNONYM_MAP, normalize_text
+
+# A parsed query: a skill name, or ("and" | "or", [child queries])
+Query = Union[str, Tuple[str, list]]
+
+# Parentheses, quoted phrases, or runs of anything else
+_TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+OPERATORS = {"AND", "OR"}
+
+def resolve_skill(phrase: str) -> str:
+    """
+    Master-list name of a skill as typed in a query, normalized like
+    resume text and with synonyms expanded ("ML" -> "machine learning").
+    """
+    skill = " ".join(normalize_text(phrase).split())
+    expanded = SYNONYM_MAP.get(skill)
+    if expanded in MASTER_SKILLS:
+        return expanded
+    if skill not in MASTER_SKILLS:
+        raise ValueError(f"Unknown skill '{phrase}'")
+    return skill
+
+def parse_query(query: str) -> Query:
+    """
+    Parses a boolean skill query such as "kubernetes AND go AND (aws OR gcp)".
+    AND binds tighter than OR and operators are case-insensitive.
+    Consecutive words form one skill ("machine learning AND python"), as
+    does a quoted phrase. Raises ValueError on malformed queries or unknown
+    skills.
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        raise ValueError("Empty query")
+    node, pos = _parse_or(tokens, 0)
+    if pos < len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos]}'")
+    return node
+
+def _parse_or(tokens: List[str], pos: int) -> Tuple[Query, int]:
+    node, pos = _parse_and(tokens, pos)
+    children = [node]
+    while pos < len(tokens) and tokens[pos].upper() == "OR":
+        node, pos = _parse_and(tokens, pos + 1)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ("or", children)), pos
+
+def _parse_and(tokens: List[str], pos: int) -> Tuple[Query, int]:
+    node, pos = _parse_operand(tokens, pos)
+    children = [node]
+    while pos < len(tokens) and tokens[pos].upper() == "AND":
+        node, pos = _parse_operand(tokens, pos + 1)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ("and", children)), pos
+
+def _parse_operand(tokens: List[str], pos: int) -> Tuple[Query, int]:
+    if pos >= len(tokens):
+        raise ValueError("Query ends where a skill was expected")
+    token = tokens[pos]
+    if token == "(":
+        node, pos = _parse_or(tokens, pos + 1)
+        if pos >= len(tokens) or tokens[pos] != ")":
+            raise ValueError("Missing ')'")
+        return node, pos + 1
+    if token == ")" or token.upper() in OPERATORS:
+        raise ValueError(f"Expected a skill, got '{token}'")
+    if token.startswith('"'):
+        return resolve_skill(token.strip('"')), pos + 1
+
+    words = []
+    while pos < len(tokens) and tokens[pos] not in ("(", ")") and not tokens[pos].startswith('"') \
+            and tokens[pos].upper() not in OPERATORS:
+        words.append(tokens[pos])
+        pos += 1
+    return resolve_skill(" ".join(words)), pos
+
+def format_query(node: Query) -> str:
+    """A parsed query written back out with resolved skill names."""
+    if isinstance(node, str):
+        return node
+    op, children = node
+    parts = [f"({format_query(c)})" if not isinstance(c, str) else c for c in children]
+    return f" {op.upper()} ".join(parts)
+
+def query_skills(node: Query) -> List[str]:
+    """Distinct skills named in a query, in order of appearance."""
+    if isinstance(node, str):
+        return [node]
+    return list(dict.fromkeys(s for child in node[1] for s in query_skills(child)))
+
+class SkillIndex:
+    """
+    In-memory posting lists: skill -> sorted int32 array of resume ids.
+    Loaded from resume_skills on first use, then caught up before each
+    query, so uploads and re-extractions served by any process show up
+    without a restart. Syncs build a new snapshot and swap it in whole,
+    so a query never sees a half-applied update.
+
+    Catching up reads rows past the last seq applied, plus every row
+    inserted in the last SKILL_INDEX_RESCAN_SECONDS: sequence values are
+    taken at insert time, so a slow transaction can commit rows below seqs
+    already applied. Every resume with a new row is reloaded whole.
+    """
+
+    def __init__(self):
+        # (postings, indexed): indexed[resume_id] is True for resumes loaded
+        self.snapshot: Tuple[Dict[str, np.ndarray], np.ndarray] = ({}, np.zeros(1, dtype=bool))
+        self.last_seq = None # None until the first full load
+        self.recent_seqs: set[int] = set() # Rows applied within the rescan window
+        self._lock = threading.Lock()
+
+    def sync(self, db: Session):
+        with self._lock:
+            if self.last_seq is None:
+                self._load(db)
+            self._catch_up(db)
+
+    def _load(self, db: Session):
+        while True:
+            last_seq = db.query(func.max(ResumeSkill.seq)).scalar() or 0
+            # Posting lengths, then every id in (skill, resume_id) order as
+            # one flat array: plain ints, no row objects per posting
+            lengths = db.execute(
+                select(ResumeSkill.skill, func.count())
+                .group_by(ResumeSkill.skill)
+                .order_by(ResumeSkill.skill)
+            ).all()
+            ids = np.fromiter(
+                db.execute(
+                    select(ResumeSkill.resume_id).order_by(ResumeSkill.skill, ResumeSkill.resume_id)
+                ).scalars(),
+                dtype=np.int32
+            )
+            offsets = np.cumsum([0] + [n for _, n in lengths])
+            # Unequal only if rows were committed between the two reads
+            if offsets[-1] == len(ids):
+                break
+
+        indexed = np.zeros(int(ids.max(initial=0)) + 1, dtype=bool)
+        indexed[ids] = True
+        postings = {
+            skill: ids[begin:end]
+            for (skill, _), begin, end in zip(lengths, offsets[:-1], offsets[1:])
+            if skill != NO_SKILLS
+        }
+        self.snapshot = (postings, indexed)
+        # Rows inserted around the load are not known to be in it: the first
+        # catch-up treats the whole rescan window as new and reloads it
+        self.last_seq = last_seq
+        self.recent_seqs = set()
+
+    def _catch_up(self, db: Session):
+        window_start = datetime.now(timezone.utc) - timedelta(seconds=settings.SKILL_INDEX_RESCAN_SECONDS)
+        rows = db.execute(
+            select(ResumeSkill.seq, ResumeSkill.resume_id)
+            .where(or_(ResumeSkill.seq > self.last_seq, ResumeSkill.created_at >= window_start))
+        ).all()
+        touched = {resume_id for seq, resume_id in rows if seq not in self.recent_seqs}
+        if touched:
+            self._reload(db, sorted(touched))
+        self.recent_seqs = {seq for seq, _ in rows}
+        self.last_seq = max([self.last_seq] + list(self.recent_seqs))
+
+    def _reload(self, db: Session, resume_ids: List[int]):
+        """Replaces these resumes' postings with their current rows."""
+        current = []
+        for begin in range(0, len(resume_ids), 5000):
+            current.extend(db.execute(
+                select(ResumeSkill.skill, ResumeSkill.resume_id)
+                .where(ResumeSkill.resume_id.in_(resume_ids[begin:begin + 5000]))
+            ).all())
+
+        postings, indexed = self.snapshot
+        postings = dict(postings)
+        touched = np.array(resume_ids, dtype=np.int32)
+        size = max(len(indexed), int(touched.max()) + 1)
+        indexed = np.concatenate([indexed, np.zeros(size - len(indexed), dtype=bool)])
+
+        # Resumes already loaded (re-extracted ones) lose their old postings first
+        loaded = touched[indexed[touched]]
+        if len(loaded):
+            for skill, posting in postings.items():
+                keep = ~np.isin(posting, loaded)
+                if not keep.all():
+                    postings[skill] = posting[keep]
+        indexed[touched] = False
+
+        by_skill: Dict[str, list] = {}
+        for skill, resume_id in current:
+            by_skill.setdefault(skill, []).append(resume_id)
+            indexed[resume_id] = True
+        for skill, ids in by_skill.items():
+            if skill == NO_SKILLS:
+                continue
+            ids = np.array(sorted(ids), dtype=np.int32)
+            old = postings.get(skill)
+            postings[skill] = ids if old is None else np.insert(old, np.searchsorted(old, ids), ids)
+
+        self.snapshot = (postings, indexed)
+
+    def search(self, node: Query, score_skills: List[str], top_k: int) -> Tuple[int, List[dict]]:
+        """
+        Resumes matching a parsed query, scored by the share of score_skills
+        they have (the skill_match formula) and cut to the top_k, newest
+        first among ties. Returns (total matches, results).
+        """
+        postings, indexed = self.snapshot
+        size = len(indexed)
+        matches = np.flatnonzero(_evaluate(node, postings, size))[::-1]
+        if len(matches) == 0 or not score_skills:
+            return len(matches), []
+
+        # Skills held per resume: each posting list scattered into one counter
+        counts = np.zeros(size, dtype=np.uint16)
+        for skill in score_skills:
+            if skill in postings:
+                counts[postings[skill]] += 1
+        scores = round_scores(counts[matches] / len(score_skills) * 100)
+        top = top_k_indices(scores, top_k)
+
+        top_ids = matches[top]
+        held = {skill: _members(postings.get(skill), top_ids) for skill in score_skills}
+        return len(matches), [
+            {
+                "resume_id": int(resume_id),
+                "score": float(scores[i]),
+                "matched_skills": [skill for skill in score_skills if held[skill][row]]
+            }
+            for row, (i, resume_id) in enumerate(zip(top.tolist(), top_ids.tolist()))
+        ]
+
+def _evaluate(node: Query, postings: Dict[str, np.ndarray], size: int) -> np.ndarray:
+    """
+    Boolean mask over resume ids matching a parsed query. Posting lists are
+    scattered into dense masks, so AND/OR are single vectorized passes no
+    matter how long the lists are.
+    """
+    if isinstance(node, str):
+        mask = np.zeros(size, dtype=bool)
+        if node in postings:
+            mask[postings[node]] = True
+        return mask
+    op, children = node
+    mask = _evaluate(children[0], postings, size)
+    for child in children[1:]:
+        if op == "and":
+            mask &= _evaluate(child, postings, size)
+        else:
+            mask |= _evaluate(child, postings, size)
+    return mask
+
+def _members(posting: Optional[np.ndarray], ids: np.ndarray) -> np.ndarray:
+    """Which of ids appear in a sorted posting list."""
+    if posting is None or len(posting) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(posting, ids), len(posting) - 1)
+    return posting[pos] == ids
+
+_index: SkillIndex | None = None
+_index_lock = threading.Lock()
+
+def get_index(db: Session) -> SkillIndex:
+    """The process-wide skill index, synced with resume_skills."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SkillIndex()
+    _index.sync(db)
+    return _index
+
+def rebuild_postings(batch_size: int = 500) -> int:
+    """
+    Rewrites resume_skills from every resume's cached features, re-extracting
+    stale ones, and returns how many resumes were indexed. Needed once for
+    resumes stored before the index existed; later changes are written as
+    features change (see models/resume_skill.py). Running servers reload
+    the rewritten resumes on their next query.
+    """
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    indexed = 0
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Resume)
+                .options(load_only(Resume.id, Resume.features, Resume.features_version))
+                .filter(Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for resume in batch:
+                if feature_store.is_stale(resume):
+                    feature_store.store_features(resume, feature_store.extract_features(resume.resume_text))
+            db.flush()
+            ids = [resume.id for resume in batch]
+            db.execute(delete(ResumeSkill).where(ResumeSkill.resume_id.in_(ids)))
+            db.execute(insert(ResumeSkill), [row for resume in batch for row in posting_rows(resume.id, resume.features)])
+            indexed += len(batch)
+            last_id = batch[-1].id
+            db.commit()
+    finally:
+        db.close()
+    return indexed
+
+if __name__ == "__main__":
+    # python -m app.services.skill_index  -> rebuild postings from the database
+    print(f"Skill postings rebuilt for {rebuild_postings()} resumes")
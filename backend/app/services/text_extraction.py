@@ -0,0 +1,152 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO
+from fastapi import HTTPException
+import PyPDF2
+import docx
+from app.config import settings
+from app.services.blob_store import get_blob_store
+
+def extract_text(filename: str, stream: BinaryIO, max_pages: int = 0) -> str:
+    """
+    Plain text of an uploaded PDF, DOCX or text file, read from a seekable
+    binary stream. PDFs are read page by page up to max_pages (0 = no
+    limit).
+    """
+    if filename.endswith(".pdf"):
+        reader = PyPDF2.PdfReader(stream)
+        pages = reader.pages if not max_pages else reader.pages[:max_pages]
+        return "\n".join(page.extract_text() or "" for page in pages).strip()
+    elif filename.endswith(".docx"):
+        doc = docx.Document(stream)
+        return "\n".join(para.text for para in doc.paragraphs).strip()
+    else:
+        # Assume text or ignore
+        return stream.read().decode("utf-8", errors="ignore").strip()
+
+def extract_stored(filename: str, key: str, max_pages: int = 0) -> str:
+    """
+    extract_text over a blob-store file. Runs in the extraction pool (so it
+    must stay a picklable top-level function); workers open the blob
+    themselves, so file bytes never travel through the pool's pipes.
+    """
+    with get_blob_store().open(key) as stream:
+        return extract_text(filename, stream, max_pages)
+
+_extraction_pool: ProcessPoolExecutor | None = None
+_extraction_pool_lock = threading.Lock()
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for document parsing, created on first use. Parsing is
+    CPU-bound pure Python, so it needs processes (not threads) to keep the
+    event loop and other requests responsive.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=settings.EXTRACTION_WORKERS or multiprocessing.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _extraction_pool
+
+def _reset_extraction_pool(pool: ProcessPoolExecutor):
+    """
+    Kills a pool whose worker is stuck on a pathological file; the next
+    call starts a fresh one. ProcessPoolExecutor cannot cancel a running
+    task, so terminating its processes is the only way to reclaim them.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+async def extract_text_async(filename: str, key: str) -> str:
+    """
+    Text of a stored upload (blob key) parsed in the extraction pool, capped at EXTRACTION_MAX_PAGES
+    pages and EXTRACTION_TIMEOUT seconds. Parse failures raise 400, a
+    timeout 422. If the pool broke under this call (a worker died, or
+    another upload's timeout recycled it), it is retried once on a new pool.
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        pool = get_extraction_pool()
+        try:
+            future = loop.run_in_executor(pool, extract_stored, filename, key, settings.EXTRACTION_MAX_PAGES)
+            return await asyncio.wait_for(future, timeout=settings.EXTRACTION_TIMEOUT)
+        except asyncio.TimeoutError:
+            _reset_extraction_pool(pool)
+            raise HTTPException(status_code=422, detail=f"Timed out parsing {filename}")
+        except BrokenProcessPool:
+            _reset_extraction_pool(pool)
+            if attempt == 0:
+                continue
+            raise HTTPException(status_code=503, detail="Document parser unavailable, please retry")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error parsing file: {str(e)}")
+
+def reprocess_stored_resumes(batch_size: int = 200) -> dict:
+    """
+    Re-extracts the text of every resume whose original file is in the
+    blob store, in parallel across the extraction pool. Rows whose text
+    changed get a new text_hash and features, and their cached term
+    vectors are dropped; the corpus model is then rebuilt so vectors and
+    IDF reflect the new text. Resumes uploaded before files were kept
+    (file_path "memory") are skipped.
+    """
+    from app.database import SessionLocal
+    from app.models.resume import Resume
+    from app.services import corpus_model, dedupe, feature_store
+
+    pool = get_extraction_pool()
+    stats = {"processed": 0, "changed": 0, "failed": 0}
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            batch = (
+                db.query(Resume)
+                .filter(Resume.id > last_id, Resume.content_hash.isnot(None), Resume.file_path != "memory")
+                .order_by(Resume.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            futures = [
+                pool.submit(extract_stored, r.filename, r.content_hash, settings.EXTRACTION_MAX_PAGES)
+                for r in batch
+            ]
+            for resume, future in zip(batch, futures):
+                stats["processed"] += 1
+                try:
+                    text_content = future.result(timeout=settings.EXTRACTION_TIMEOUT)
+                except Exception as e:
+                    print(f"Reprocessing resume {resume.id} failed: {e}")
+                    stats["failed"] += 1
+                    continue
+                if text_content != resume.resume_text:
+                    resume.resume_text = text_content
+                    resume.text_hash = dedupe.text_hash(text_content)
+                    resume.term_vector = None
+                    feature_store.store_features(resume, feature_store.extract_features(text_content))
+                    stats["changed"] += 1
+            last_id = batch[-1].id
+            db.commit()
+    finally:
+        db.close()
+
+    if stats["changed"]:
+        corpus_model.rebuild_model()
+    return stats
+
+if __name__ == "__main__":
+    # python -m app.services.text_extraction  -> re-extract all stored files
+    print(f"Reprocessed stored resumes: {reprocess_stored_resumes()}")
@@ -0,0 +1,130 @@
+import re
+from datetime import date
+from app.utils.skills import extract_skills_from_normalized, NON_SKILL_CHARS
+
+# Everything the scorer reads from a document comes out of one finditer
+# pass over the lowercased text (EXTRACTION_PATTERN), plus one trie walk
+# over the normalized tokens for skills (see extract_features).
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+_YEAR = r"(?:19|20)\d{2}"
+
+# Words after "ms"/"bs" that mean it is not a degree ("MS Office", "MS SQL")
+_NOT_DEGREE = r"(?!\s*(?:office|excel|word|sql|access|teams|project|outlook|powerpoint|visio|dynamics|azure|windows|dos|paint)\b)"
+_START = r"(?<![a-z0-9.])"
+_END = r"(?![a-z0-9])"
+
+# Every branch starts at a word boundary with one of these characters, so
+# the engine only tries the alternation at a few positions per line.
+EXTRACTION_PATTERN = re.compile(
+    r"\b(?=[\dabdfjmnops])(?=\d|jan|feb|ma[rys]|apr|ju[nl]|aug|sep|oct|nov|dec|ph|doc|m[.sbt]|b[.ast])(?:"
+    # "5 years", "5+ yrs", "10-year"
+    r"(?<![\d.])(?P<years>\d{1,2})\s*\+?\s*-?\s*(?:years?|yrs?)\b"
+    # "2018 - 2023", "Jan 2018 – Mar 2023", "06/2019 to present"; not
+    # inside longer digit runs such as phone numbers ("555-2019-2023")
+    r"|(?<!\d[/.-])(?:(?P<m1>" + _MONTH + r")\s*|(?P<n1>\d{1,2})[/.-])?(?P<y1>" + _YEAR + r")"
+    r"\s*(?:-|–|—|to|until|till)\s*"
+    r"(?:(?:(?P<m2>" + _MONTH + r")\s*|(?P<n2>\d{1,2})[/.-])?(?P<y2>" + _YEAR + r")\b(?![/.-]\d)"
+    r"|(?P<open>present|current|now|date|today)\b)"
+    # Degrees, only as whole tokens. A bare "master"/"bachelor" is a job
+    # title or phrase ("Scrum master", "Master data"), not a degree.
+    r"|" + _START + r"(?P<doctorate>ph\.?\s?d\.?|doctorate|doctoral)" + _END +
+    r"|" + _START + r"(?P<master>master'?s|master\s+of|m\.s\.?|m\.sc\.?|msc|mba|m\.tech|mtech|m\.e\.|ms" + _NOT_DEGREE + r")" + _END +
+    r"|" + _START + r"(?P<bachelor>bachelor'?s|bachelor\s+of|b\.s\.?|b\.sc\.?|bsc|b\.tech|btech|b\.e\.|b\.a\.|bs" + _NOT_DEGREE + r")" + _END +
+    r")"
+)
+
+DEGREE_LEVELS = {"doctorate": 3, "master": 2, "bachelor": 1}
+
+# Caps for implausible values ("1999 years", ranges spanning a lifetime)
+MAX_YEARS = 50
+
+def _month(name: str | None, number: str | None) -> int:
+    if name:
+        return _MONTHS[name[:3]]
+    if number and 1 <= int(number) <= 12:
+        return int(number)
+    return 1
+
+def _merged_years(ranges: list[tuple[int, int]]) -> float:
+    """Total years covered by (start, end) month-index ranges, overlaps counted once."""
+    total = 0
+    current_start, current_end = None, None
+    for start, end in sorted(ranges):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return round(min(total / 12, MAX_YEARS), 1)
+
+def scan(text: str) -> dict:
+    """
+    Single pass over the text. Returns:
+    - "years": explicit "N years" mentions
+    - "ranges": employment date ranges as (start, end) month indexes;
+      ranges on a line that names a degree are treated as study dates
+    - "education_level": highest degree found (0 none, 1 bachelor,
+      2 master, 3 doctorate)
+    """
+    return _scan((text or "").lower())
+
+def _scan(text: str) -> dict:
+    today = date.today()
+    now = today.year * 12 + today.month
+
+    years = []
+    ranges = [] # (line start, start month index, end month index)
+    degree_lines = set()
+    level = 0
+    for match in EXTRACTION_PATTERN.finditer(text):
+        # lastgroup is the innermost group that closed last: "years", the
+        # end of a range ("y2"/"open") or the degree group
+        kind = match.lastgroup
+        if kind == "years":
+            years.append(float(match.group("years")))
+        elif kind == "y2" or kind == "open":
+            start = int(match.group("y1")) * 12 + _month(match.group("m1"), match.group("n1"))
+            if kind == "open":
+                end = now
+            else:
+                end = int(match.group("y2")) * 12 + _month(match.group("m2"), match.group("n2"))
+            if start <= end <= now + 12:
+                ranges.append((text.rfind("\n", 0, match.start()), start, end))
+        else:
+            level = max(level, DEGREE_LEVELS[kind])
+            degree_lines.add(text.rfind("\n", 0, match.start()))
+
+    return {
+        "years": [y for y in years if y <= MAX_YEARS],
+        "ranges": [(start, end) for line, start, end in ranges if line not in degree_lines],
+        "education_level": level,
+    }
+
+def years_from_scan(scanned: dict) -> float:
+    """
+    Years of experience: the larger of the longest explicit mention and the
+    total time covered by employment date ranges.
+    """
+    explicit = max(scanned["years"], default=0.0)
+    return max(explicit, _merged_years(scanned["ranges"]))
+
+def extract_features(text: str) -> dict:
+    """
+    Skills, years of experience and education level of a document: one
+    regex pass for years/degrees and one trie walk for skills.
+    """
+    lowered = (text or "").lower()
+    scanned = _scan(lowered)
+    return {
+        "skills": sorted(extract_skills_from_normalized(NON_SKILL_CHARS.sub(" ", lowered))),
+        "years_exp": years_from_scan(scanned),
+        "education_level": scanned["education_level"],
+    }
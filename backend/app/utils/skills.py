@@ -40,52 +40,94 @@ SYNONYM_MAP = {
     "bi": "business intelligence"
 }
 
+# Remove special chars but keep some that might be part of skills like C++, C#, .NET
+# For simplicity, we'll replace non-alphanumeric (except +, #, .) with space
+# (spaces are left out of the class: replacing them with themselves is slow)
+NON_SKILL_CHARS = re.compile(r'[^a-z0-9+#. ]')
+
 def normalize_text(text: str) -> str:
     """Basic text normalization."""
-    # Remove special chars but keep some that might be part of skills like C++, C#, .NET
-    # For simplicity, we'll replace non-alphanumeric (except +, #, .) with space
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9+#.]', ' ', text)
-    return text
+    return NON_SKILL_CHARS.sub(' ', text.lower())
+
+# Terminal marker inside the skill trie. Tokens are always strings, so a
+# None key can never collide with a real token.
+_TRIE_END = None
+
+def build_skill_trie(skills: set[str], synonyms: dict[str, str]) -> dict:
+    """
+    Builds a token-level trie over the skill list.
+    Each skill is split on single spaces, mirroring how normalized text is
+    tokenized in extract_skills, so a path through the trie is a run of
+    consecutive tokens. Terminal nodes hold the set of skills they emit.
+    Synonyms are added as single-token paths emitting their expansion
+    (only when the expansion is itself a known skill).
+    """
+    trie: dict = {}
+
+    def insert(phrase: str, emitted: str):
+        node = trie
+        for token in phrase.split(" "):
+            node = node.setdefault(token, {})
+        node.setdefault(_TRIE_END, set()).add(emitted)
+
+    for skill in skills:
+        insert(skill, skill)
+
+    for short, expanded in synonyms.items():
+        if expanded in skills:
+            insert(short, expanded)
+
+    return trie
+
+SKILL_TRIE = build_skill_trie(MASTER_SKILLS, SYNONYM_MAP)
 
 def extract_skills(text: str) -> list[str]:
     """
     Extracts skills from text using the master list and synonym mapping.
-    Matches primarily by checking if the skill token(s) exist in the text.
     Processing:
-    1. Normalize text
-    2. Check for exact matches of multi-word skills first (simple heuristic)
-    3. Check for single word skills
-    4. Handle synonyms
+    1. Normalize text (only [a-z0-9+#.] and spaces survive)
+    2. Split on single spaces, so runs of spaces leave empty tokens and a
+       skill matches only where it is bounded by spaces or the text edges
+       (same whole-token semantics as the old per-skill regex search,
+       including `c++`, `c#`, `.net` and multi-word skills)
+    3. Look tokens up in the prebuilt SKILL_TRIE, collecting skills and
+       synonym expansions at terminal nodes
     """
-    normalized_text = normalize_text(text)
-    tokens = set(normalized_text.split())
-    
+    return list(extract_skills_from_normalized(normalize_text(text)))
+
+def extract_skills_from_normalized(normalized: str) -> set[str]:
+    """
+    Steps 2-3 of extract_skills, for text already passed through
+    normalize_text. Root tokens are resolved with one set intersection;
+    the token list is only walked from tokens that start a multi-token
+    skill.
+    """
+    tokens = normalized.split(" ")
+    n_tokens = len(tokens)
     found_skills = set()
 
-    # 1. Check for synonyms in the tokens
-    for token in list(tokens):
-        if token in SYNONYM_MAP:
-            expanded = SYNONYM_MAP[token]
-            # Add the expanded term to tokens for matching (optional) or just add directly
-            # Here we will check if the expanded term is in our master list
-            if expanded in MASTER_SKILLS:
-                found_skills.add(expanded)
-
-    # 2. Check for skills in text
-    # This is a naive O(N*M) approach, effective for reasonable skill list sizes
-    # Ideally we'd use Aho-Corasick or a Trie for large scale
-    
-    for skill in MASTER_SKILLS:
-        # We need to be careful about substrings. e.g. "go" matches "good".
-        # Safe approach: regex match with word boundaries
-        
-        # Escape special characters for regex (like c++, c#)
-        escaped_skill = re.escape(skill)
-        
-        # Look for whole word match
-        pattern = r'(?:^|\s)' + escaped_skill + r'(?:$|\s)'
-        if re.search(pattern, normalized_text):
-            found_skills.add(skill)
-            
-    return list(found_skills)
+    multi_starts = set()
+    for token in SKILL_TRIE.keys() & set(tokens):
+        node = SKILL_TRIE[token]
+        emitted = node.get(_TRIE_END)
+        if emitted:
+            found_skills.update(emitted)
+        if len(node) > (1 if emitted else 0):
+            multi_starts.add(token)
+
+    if not multi_starts:
+        return found_skills
+
+    for start in [i for i, token in enumerate(tokens) if token in multi_starts]:
+        node = SKILL_TRIE[tokens[start]]
+        pos = start + 1
+        while pos < n_tokens:
+            node = node.get(tokens[pos])
+            if node is None:
+                break
+            emitted = node.get(_TRIE_END)
+            if emitted:
+                found_skills.update(emitted)
+            pos += 1
+
+    return found_skills
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Tests import the app the way uvicorn does (from backend/), against a
+# throwaway database, model and blob store instead of the ones in ./
+_state = tempfile.mkdtemp(prefix="ats-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_state}/test.db")
+os.environ.setdefault("CORPUS_MODEL_PATH", f"{_state}/corpus_model.npz")
+os.environ.setdefault("LLM_CACHE_DISK_PATH", f"{_state}/llm_cache.sqlite3")
+os.environ.setdefault("BLOB_STORE_PATH", f"{_state}/blobs")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.main import app
+from app.models.job import AnalysisJob
+from app.models.job_description import JobDescription
+from app.models.resume import Resume
+from app.services import job_queue, openrouter_client
+
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def no_workers(monkeypatch):
+    # Jobs stay queued; these tests only look at what gets enqueued
+    monkeypatch.setattr(job_queue, "start_workers", lambda: None)
+
+def _pair():
+    db = SessionLocal()
+    try:
+        resume = Resume(filename="cv.txt", file_path="memory", resume_text="Python developer, 4 years of experience")
+        jd = JobDescription(role="Developer", jd_text="Python and SQL developer, 3 years")
+        db.add_all([resume, jd])
+        db.commit()
+        return resume.id, jd.id
+    finally:
+        db.close()
+
+def _run(resume_id, jd_id):
+    response = client.post("/analysis/run", json={"resume_id": resume_id, "jd_id": jd_id, "use_llm": True})
+    assert response.status_code == 200
+    return response.json()
+
+def _set_status(job_id, status):
+    db = SessionLocal()
+    try:
+        db.get(AnalysisJob, job_id).status = status
+        db.commit()
+    finally:
+        db.close()
+
+def test_cached_analysis_reuses_its_llm_job():
+    resume_id, jd_id = _pair()
+    first = _run(resume_id, jd_id)
+    assert first["llm_status"] == "queued"
+    assert _run(resume_id, jd_id)["job_id"] == first["job_id"]
+
+    _set_status(first["job_id"], "done")
+    again = _run(resume_id, jd_id)
+    assert (again["job_id"], again["llm_status"]) == (first["job_id"], "done")
+
+def test_failed_llm_job_is_retried():
+    resume_id, jd_id = _pair()
+    first = _run(resume_id, jd_id)
+    _set_status(first["job_id"], "failed")
+    retry = _run(resume_id, jd_id)
+    assert retry["job_id"] != first["job_id"]
+    assert retry["llm_status"] == "queued"
+
+def test_llm_outage_fails_the_job_and_the_next_run_retries(monkeypatch):
+    async def unavailable(messages, model=None):
+        raise RuntimeError("provider unavailable")
+    monkeypatch.setattr(openrouter_client, "acall_openrouter", unavailable)
+
+    resume_id, jd_id = _pair()
+    first = _run(resume_id, jd_id)
+    job_queue.run_job(first["job_id"])
+
+    db = SessionLocal()
+    try:
+        job = db.get(AnalysisJob, first["job_id"])
+        assert job.status == "failed"
+        assert "provider unavailable" in job.error
+    finally:
+        db.close()
+
+    retry = _run(resume_id, jd_id)
+    assert retry["job_id"] != first["job_id"]
+    assert retry["llm_status"] == "queued"
+
+def test_partial_llm_results_are_kept_and_reused(monkeypatch):
+    async def summary_only(messages, model=None):
+        if "summary" in str(messages).lower():
+            return '{"summary": "Seasoned Python developer"}'
+        raise RuntimeError("provider unavailable")
+    monkeypatch.setattr(openrouter_client, "acall_openrouter", summary_only)
+
+    resume_id, jd_id = _pair()
+    first = _run(resume_id, jd_id)
+    job_queue.run_job(first["job_id"])
+    again = _run(resume_id, jd_id)
+    assert (again["job_id"], again["llm_status"]) == (first["job_id"], "done")
@@ -0,0 +1,50 @@
+import hashlib
+import io
+import os
+import pytest
+from app.services import blob_store
+
+def test_incomplete_store_cannot_be_instantiated():
+    class NoUri(blob_store.BlobStore):
+        def put_file(self, source, max_bytes=0):
+            return "", 0
+
+        def open(self, key):
+            return io.BytesIO()
+
+        def exists(self, key):
+            return False
+
+    with pytest.raises(TypeError):
+        NoUri()
+
+def test_blobs_are_content_addressed(tmp_path):
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    data = b"resume bytes" * 1000
+    key, size = store.put_file(io.BytesIO(data))
+    assert (key, size) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert store.exists(key)
+    assert store.uri(key) == f"local://{key[:2]}/{key[2:4]}/{key}"
+    with store.open(key) as f:
+        assert f.read() == data
+
+    # Same bytes again: same key, still one file, no temp files left behind
+    assert store.put_file(io.BytesIO(data)) == (key, size)
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [key]
+
+def test_put_file_enforces_the_size_limit(tmp_path):
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    limit = 2 * blob_store.CHUNK_SIZE
+    key, _ = store.put_file(io.BytesIO(b"x" * limit), max_bytes=limit)
+    with pytest.raises(blob_store.BlobTooLargeError):
+        store.put_file(io.BytesIO(b"y" * (limit + 1)), max_bytes=limit)
+    files = [name for _, _, names in os.walk(tmp_path) for name in names]
+    assert files == [key]
+
+def test_delete_removes_the_blob(tmp_path):
+    store = blob_store.LocalBlobStore(str(tmp_path))
+    key, _ = store.put_file(io.BytesIO(b"to be deleted"))
+    store.delete(key)
+    assert not store.exists(key)
+    store.delete(key)  # already gone: no error
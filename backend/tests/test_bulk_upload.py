@@ -0,0 +1,71 @@
+import hashlib
+import io
+import os
+import zipfile
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+def _zip(names):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, f"{name} python developer")
+        archive.writestr("__MACOSX/._a.txt", "metadata")
+        archive.writestr("docs/", "")
+    return buffer.getvalue()
+
+def _blobs():
+    return sorted(
+        name for _, _, names in os.walk(settings.BLOB_STORE_PATH) for name in names
+    ) if os.path.exists(settings.BLOB_STORE_PATH) else []
+
+@pytest.fixture
+def limit(monkeypatch):
+    monkeypatch.setattr(settings, "BULK_UPLOAD_MAX_FILES", 3)
+
+def test_over_the_limit_is_rejected_before_storing_anything(limit):
+    before = _blobs()
+    response = client.post("/resumes/bulk_upload", files=[
+        ("files", ("one.txt", b"limit test one", "text/plain")),
+        ("files", ("batch.zip", _zip(["limit-a.txt", "limit-b.txt", "limit-c.txt"]), "application/zip")),
+    ])
+    assert response.status_code == 413
+    assert "(4)" in response.json()["detail"]
+    assert _blobs() == before
+
+def test_zip_members_count_towards_the_limit(limit):
+    response = client.post("/resumes/bulk_upload", files=[
+        ("files", ("batch.zip", _zip(["count-a.txt", "count-b.txt"]), "application/zip")),
+        ("files", ("broken.zip", b"not a zip", "application/zip")),
+    ])
+    assert response.status_code == 200
+    results = response.json()
+    assert [r["filename"] for r in results] == ["count-a.txt", "count-b.txt", "broken.zip"]
+    assert results[2] == {"filename": "broken.zip", "status": "failed", "id": None, "error": "Not a valid zip archive"}
+
+def test_failed_upload_leaves_no_blob():
+    before = _blobs()
+    response = client.post("/resumes/upload", files={"file": ("corrupt.pdf", b"not a pdf", "application/pdf")})
+    assert response.status_code == 400
+    assert _blobs() == before
+
+def test_text_duplicate_from_other_bytes_leaves_no_blob():
+    assert client.post("/resumes/upload", files={"file": ("dup.txt", b"duplicate text python", "text/plain")}).status_code == 200
+    before = _blobs()
+    response = client.post("/resumes/upload", files={"file": ("dup.txt", b"duplicate text python\n", "text/plain")})
+    assert response.status_code == 200
+    assert response.json()["duplicate"] is True
+    assert _blobs() == before
+
+def test_bulk_upload_keeps_only_blobs_of_stored_resumes():
+    before = _blobs()
+    response = client.post("/resumes/bulk_upload", files=[
+        ("files", ("good.txt", b"bulk orphan test java developer", "text/plain")),
+        ("files", ("bad.pdf", b"bulk orphan test not a pdf", "application/pdf")),
+    ])
+    assert [r["status"] for r in response.json()] == ["created", "failed"]
+    assert _blobs() == sorted(before + [hashlib.sha256(b"bulk orphan test java developer").hexdigest()])
@@ -0,0 +1,65 @@
+import os
+import threading
+from app.services import corpus_model
+from app.services.corpus_model import CorpusModel
+
+def test_concurrent_saves_do_not_collide(tmp_path):
+    path = str(tmp_path / "model.npz")
+    model = CorpusModel()
+    errors = []
+
+    def upload(i):
+        try:
+            for _ in range(10):
+                model.add_documents(corpus_model.term_counts([f"python developer {i}"]))
+                model.save(path)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=upload, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert CorpusModel.load(path).n_docs == 40
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".npz")] == ["model.npz"]
+
+def test_saves_merge_documents_from_other_processes(tmp_path):
+    path = str(tmp_path / "model.npz")
+    CorpusModel().save(path)
+    first = CorpusModel.load(path)
+    second = CorpusModel.load(path)
+
+    first.add_documents(corpus_model.term_counts(["python sql", "java"]))
+    first.save(path)
+    second.add_documents(corpus_model.term_counts(["python"]))
+    second.save(path)
+
+    saved = CorpusModel.load(path)
+    python = corpus_model.term_counts(["python"]).indices[0]
+    assert saved.n_docs == 3
+    assert saved.doc_freq[python] == 2
+    assert second.n_docs == 3
+
+def test_overwrite_replaces_saved_model(tmp_path):
+    path = str(tmp_path / "model.npz")
+    model = CorpusModel()
+    model.add_documents(corpus_model.term_counts(["python", "java"]))
+    model.save(path)
+
+    rebuilt = CorpusModel()
+    rebuilt.add_documents(corpus_model.term_counts(["sql"]))
+    rebuilt.save(path, merge=False)
+    assert CorpusModel.load(path).n_docs == 1
+
+def test_save_if_due_waits_for_interval(tmp_path):
+    path = str(tmp_path / "model.npz")
+    model = CorpusModel()
+    model.add_documents(corpus_model.term_counts(["python"]))
+    model.save_if_due(path, interval=3600)
+    assert not os.path.exists(path)
+
+    model.save_if_due(path, interval=0)
+    assert CorpusModel.load(path).n_docs == 1
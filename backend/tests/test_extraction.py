@@ -0,0 +1,64 @@
+import re
+import pytest
+from app.utils import extraction, skills
+
+# The separate extractors extract_features replaced, frozen for comparison
+def old_years(text):
+    matches = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)', text, re.IGNORECASE)
+    return max(float(m) for m in matches) if matches else 0.0
+
+OLD_DEGREES = {
+    "phd": 3, "doctorate": 3, "master": 2, "ms ": 2, "m.s.": 2, "mba": 2,
+    "bachelor": 1, "bs ": 1, "b.s.": 1, "b.tech": 1,
+}
+
+def old_education(text):
+    text_lower = text.lower()
+    return max((level for degree, level in OLD_DEGREES.items() if degree in text_lower), default=0)
+
+@pytest.mark.parametrize("text, years, level", [
+    # Job titles and phrases are not degrees, and their date ranges count
+    ("Scrum master 2015 - 2020", 5.0, 0),
+    ("Master data management specialist", 0.0, 0),
+    ("Bachelor party planner 2010-2012", 2.0, 0),
+    ("Managed MS Office rollout for 200 users", 0.0, 0),
+    ("Built distributed systems", 0.0, 0),
+    # Digit runs around a year pair are not a range
+    ("phone: 555-2019-2023", 0.0, 0),
+    ("Order 2019-2023-17 shipped", 0.0, 0),
+    # Real degrees; their study dates are not experience
+    ("Master of Science 2004-2006\nEngineer 2010 - 2014", 4.0, 2),
+    ("Master's degree in Physics", 0.0, 2),
+    ("Masters in Computer Science", 0.0, 2),
+    ("Bachelor of Arts, 2001 - 2005", 0.0, 1),
+    ("B.S. Computer Science", 0.0, 1),
+    ("MS Computer Science, MBA", 0.0, 2),
+    ("Ph.D. in Chemistry", 0.0, 3),
+    # Ranges and explicit mentions
+    ("Jan 2018 – Mar 2023", 5.2, 0),
+    ("06/2019 - 03/2021", 1.8, 0),
+    ("2010 - 2015\n2013 - 2016", 6.0, 0),
+    ("8+ years of experience\n2020 - 2022", 8.0, 0),
+])
+def test_extract_features(text, years, level):
+    features = extraction.extract_features(text)
+    assert (features["years_exp"], features["education_level"]) == (years, level)
+
+@pytest.mark.parametrize("text", [
+    "Senior developer with 7 years of Python and SQL",
+    "5+ yrs building Java services; 3 years leading a team",
+    "Bachelor's degree in Computer Science. 4 years of experience.",
+    "Master's in Data Science, B.S. Mathematics, 10 years in analytics",
+    "PhD in Physics, 2 years postdoc",
+    "Doctorate in Economics",
+    "No numbers or degrees here",
+    "",
+])
+def test_matches_old_extractors_on_unambiguous_text(text):
+    features = extraction.extract_features(text)
+    assert features["years_exp"] == old_years(text)
+    assert features["education_level"] == old_education(text)
+    assert features["skills"] == sorted(skills.extract_skills(text))
+
+def test_open_ranges_end_today():
+    assert extraction.extract_features("Engineer, 2000 - present")["years_exp"] >= 25
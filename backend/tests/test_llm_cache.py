@@ -0,0 +1,76 @@
+import time
+import pytest
+from app.services import llm_cache
+
+MESSAGES = [{"role": "user", "content": "Rewrite my bullets"}]
+
+def _backends(tmp_path, max_entries):
+    return [
+        llm_cache.MemoryLRUBackend(max_entries),
+        llm_cache.SQLiteBackend(str(tmp_path / "cache" / "llm.sqlite3"), max_entries),
+    ]
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class NoDelete(llm_cache.CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, expires_at):
+            return 0
+
+        def clear(self):
+            pass
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        NoDelete()
+
+@pytest.mark.parametrize("index", [0, 1])
+def test_backends_evict_least_recently_used(tmp_path, index):
+    backend = _backends(tmp_path, max_entries=2)[index]
+    expires = time.time() + 60
+    assert backend.set("a", "1", expires) == 0
+    time.sleep(0.01)
+    backend.set("b", "2", expires)
+    time.sleep(0.01)
+    assert backend.get("a") == ("1", expires) # "a" is now the most recent
+    time.sleep(0.01)
+    assert backend.set("c", "3", expires) == 1
+    assert backend.get("b") is None
+    assert backend.get("a") is not None and backend.get("c") is not None
+    assert len(backend) == 2
+
+    backend.delete("a")
+    assert backend.get("a") is None
+    backend.clear()
+    assert len(backend) == 0
+
+def test_sqlite_tier_survives_reopening(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    llm_cache.SQLiteBackend(path, 10).set("key", "value", time.time() + 60)
+    assert llm_cache.SQLiteBackend(path, 10).get("key")[0] == "value"
+
+def test_cache_promotes_slow_tier_hits_and_drops_expired(tmp_path):
+    memory, disk = _backends(tmp_path, max_entries=10)
+    cache = llm_cache.LLMResponseCache([memory, disk], ttl=60)
+    assert cache.get("model", MESSAGES) is None
+
+    cache.set("model", MESSAGES, "rewritten")
+    memory.clear()
+    assert cache.get("model", MESSAGES) == "rewritten"
+    assert len(memory) == 1 # copied back into the fast tier
+    assert cache.get_stats()["tiers"][1]["hits"] == 1
+
+    key = llm_cache.cache_key("model", MESSAGES)
+    for tier in (memory, disk):
+        tier.set(key, "stale", time.time() - 1)
+    assert cache.get("model", MESSAGES) is None
+    assert len(memory) == 0 and len(disk) == 0
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 2)
+
+def test_cache_key_ignores_dict_ordering():
+    assert llm_cache.cache_key("m", [{"role": "user", "content": "x"}]) == \
+        llm_cache.cache_key("m", [{"content": "x", "role": "user"}])
@@ -0,0 +1,112 @@
+import asyncio
+import httpx
+import pytest
+import requests
+from fastapi import HTTPException
+from app.services import llm_governor, openrouter_client
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {}
+        self.text = str(body)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code}", response=self)
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def post(self, *args, **kwargs):
+        return self.responses.pop(0)
+
+OK = {"choices": [{"message": {"content": "hello"}}]}
+
+@pytest.fixture
+def governor(monkeypatch):
+    gov = llm_governor.LLMGovernor(
+        rate=0, burst=1, max_concurrency=2, queue_timeout=1,
+        max_retries=0, backoff_base=0, backoff_max=0,
+        breaker_threshold=1, breaker_cooldown=0
+    )
+    monkeypatch.setattr(openrouter_client, "get_governor", lambda: gov)
+    monkeypatch.setattr(openrouter_client, "get_cache", lambda: None)
+    monkeypatch.setattr(openrouter_client.settings, "OPENROUTER_API_KEY", "test-key")
+    return gov
+
+def _open_circuit(gov):
+    gov.breaker.record_failure()
+    assert gov.breaker.state == "open"
+
+def test_exception_inside_slot_frees_the_probe(governor):
+    _open_circuit(governor)
+    with pytest.raises(KeyError):
+        with governor.slot():
+            assert governor.breaker.state == "half_open"
+            raise KeyError("choices")
+    # Not stuck: the next caller gets to probe
+    with governor.slot():
+        pass
+
+def test_cancelled_async_probe_frees_the_probe(governor):
+    _open_circuit(governor)
+
+    async def probe():
+        async with governor.aslot():
+            await asyncio.sleep(10)
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(probe(), timeout=0.01)
+        async with governor.aslot():
+            pass
+
+    asyncio.run(main())
+
+@pytest.mark.parametrize("body", [{"error": {"message": "upstream overloaded"}}, ValueError("not json"), {"choices": []}])
+def test_malformed_body_is_a_502_and_does_not_wedge_the_breaker(governor, monkeypatch, body):
+    _open_circuit(governor)
+    session = FakeSession([FakeResponse(200, body), FakeResponse(200, OK)])
+    monkeypatch.setattr(openrouter_client, "get_session", lambda: session)
+
+    with pytest.raises(HTTPException) as excinfo:
+        openrouter_client.call_openrouter([{"role": "user", "content": "hi"}])
+    assert excinfo.value.status_code == 502
+    assert governor.breaker.state == "open" # the failed probe re-opened it
+
+    # Cooldown is 0: the next call probes again and closes the circuit
+    assert openrouter_client.call_openrouter([{"role": "user", "content": "hi"}]) == "hello"
+    assert governor.breaker.state == "closed"
+
+def test_async_malformed_body_is_a_502_and_does_not_wedge_the_breaker(governor, monkeypatch):
+    _open_circuit(governor)
+    bodies = [{"error": {"message": "upstream overloaded"}}, OK]
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=bodies.pop(0)))
+    monkeypatch.setattr(openrouter_client, "get_async_client", lambda: httpx.AsyncClient(transport=transport))
+
+    async def main():
+        with pytest.raises(HTTPException) as excinfo:
+            await openrouter_client.acall_openrouter([{"role": "user", "content": "hi"}])
+        assert excinfo.value.status_code == 502
+        return await openrouter_client.acall_openrouter([{"role": "user", "content": "hi"}])
+
+    assert asyncio.run(main()) == "hello"
+    assert governor.breaker.state == "closed"
+
+@pytest.mark.parametrize("attempt", [0, 3, 10])
+def test_retry_after_longer_than_backoff_max_is_honored(attempt):
+    gov = llm_governor.LLMGovernor(
+        rate=0, burst=1, max_concurrency=1, queue_timeout=1, max_retries=3,
+        backoff_base=1, backoff_max=30, breaker_threshold=0, breaker_cooldown=0
+    )
+    assert gov.backoff(attempt, "60") == 60
+    # Without a hint only the exponential part is capped
+    assert gov.backoff(attempt) <= 30
@@ -0,0 +1,25 @@
+from app.services.prompt_budget import fit_resume
+
+def test_heading_before_any_content_is_dropped_with_its_section():
+    # No header lines: the first line is already a heading
+    resume = "\n".join(
+        ["EXPERIENCE"]
+        + [f"- Maintained legacy reporting module number {i} for the billing team" for i in range(40)]
+        + ["SKILLS", "Python, SQL, Docker"]
+    )
+
+    fitted = fit_resume(resume, budget=20, missing_skills=[], jd_terms=set())
+
+    lines = fitted.splitlines()
+    assert "EXPERIENCE" not in lines
+    assert lines == ["SKILLS", "Python, SQL, Docker"]
+
+def test_heading_kept_when_its_section_keeps_content():
+    resume = "\n".join(
+        ["EXPERIENCE", "- Built Kubernetes operators in Go"]
+        + [f"- Maintained legacy reporting module number {i} for the billing team" for i in range(40)]
+    )
+
+    fitted = fit_resume(resume, budget=30, missing_skills=["kubernetes"], jd_terms={"operators"})
+
+    assert fitted.splitlines()[:2] == ["EXPERIENCE", "- Built Kubernetes operators in Go"]
@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.main import app
+from app.models.job_description import JobDescription
+from app.models.ranking import Ranking
+from app.models.resume import Resume
+
+client = TestClient(app)
+
+def _create(texts, jd_text):
+    db = SessionLocal()
+    try:
+        resumes = [Resume(filename=f"cv{i}.txt", file_path="memory", resume_text=text) for i, text in enumerate(texts)]
+        jd = JobDescription(role="Backend developer", jd_text=jd_text)
+        db.add_all([*resumes, jd])
+        db.commit()
+        return [r.id for r in resumes], jd.id
+    finally:
+        db.close()
+
+def test_reweight_uses_only_the_latest_ranking():
+    resume_ids, jd_id = _create([
+        "Python and SQL developer, 5 years of experience. Master's degree.",
+        "Java developer, 2 years of experience.",
+        "Python developer. Bachelor's degree.",
+        "SQL analyst, 8 years of experience.",
+    ], "Python and SQL developer with 3 years of experience")
+
+    first = client.post(f"/rank/jd/{jd_id}", json={"resume_ids": resume_ids})
+    assert first.status_code == 200
+    latest = resume_ids[2:]
+    second = client.post(f"/rank/jd/{jd_id}", json={"resume_ids": latest})
+    assert second.status_code == 200
+
+    db = SessionLocal()
+    try:
+        stored = db.query(Ranking.resume_id, Ranking.rank_position).filter(Ranking.jd_id == jd_id).all()
+    finally:
+        db.close()
+    assert sorted(resume_id for resume_id, _ in stored) == sorted(latest)
+    assert sorted(position for _, position in stored) == [1, 2]
+
+    response = client.post(f"/rank/jd/{jd_id}/reweight", json={"weights": {"experience": 0.9}})
+    assert response.status_code == 200
+    results = response.json()
+    assert sorted(r["resume_id"] for r in results) == sorted(latest)
+    assert [r["rank_position"] for r in results] == [1, 2]
+    assert all(0 <= r["ats_score"] <= 100 for r in results)
+    # Sub-scores are the latest run's
+    by_id = {r["resume_id"]: r["scores"] for r in second.json()}
+    assert all(r["scores"]["skill_match"] == by_id[r["resume_id"]]["skill_match"] for r in results)
+
+def test_non_finite_weights_are_rejected():
+    resume_ids, jd_id = _create(["Python developer, 3 years of experience."], "Python developer")
+    assert client.post(f"/rank/jd/{jd_id}", json={"resume_ids": resume_ids}).status_code == 200
+    for value in ("NaN", "Infinity"):
+        response = client.post(
+            f"/rank/jd/{jd_id}/reweight",
+            content=f'{{"weights": {{"experience": {value}}}}}',
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 400, value
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from app.services import scoring
+
+def _sub_scores(n, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {name: np.round(rng.uniform(0, 100, n), 2) for name in scoring.SCORERS}
+    # Both ends of the scale
+    for values in columns.values():
+        values[:2] = (0.0, 100.0)
+    return columns
+
+@pytest.mark.parametrize("overrides", [
+    None,
+    {"experience": 0.9},
+    {"skill_match": 1, "similarity": 1, "experience": 1, "education": 1},
+    {"skill_match": 0, "similarity": 0, "experience": 0, "education": 0.05},
+    {"skill_match": 7.5, "education": 0},
+])
+def test_final_scores_stay_within_0_and_100(overrides):
+    pipeline = scoring.ScoringPipeline(scoring.resolve_weights(overrides))
+    final = pipeline.combine(_sub_scores(500))
+    assert final.min() >= 0
+    assert final.max() <= 100
+
+def test_all_sub_scores_at_100_give_100_for_any_profile():
+    columns = {name: np.full(3, 100.0) for name in scoring.SCORERS}
+    pipeline = scoring.ScoringPipeline(scoring.resolve_weights({"experience": 0.9}))
+    assert pipeline.combine(columns).tolist() == [100.0, 100.0, 100.0]
+
+def test_default_profile_is_the_plain_weighted_sum():
+    columns = _sub_scores(50, seed=1)
+    pipeline = scoring.ScoringPipeline(scoring.resolve_weights())
+    expected = [
+        round(sum(float(columns[name][i]) * weight for name, weight in scoring.DEFAULT_WEIGHTS.items()), 2)
+        for i in range(50)
+    ]
+    assert pipeline.combine(columns).tolist() == expected
+
+def test_weights_are_relative():
+    columns = _sub_scores(50, seed=2)
+    doubled = {name: 2 * weight for name, weight in scoring.DEFAULT_WEIGHTS.items()}
+    default = scoring.ScoringPipeline(scoring.resolve_weights()).combine(columns)
+    scaled = scoring.ScoringPipeline(scoring.resolve_weights(doubled)).combine(columns)
+    np.testing.assert_allclose(scaled, default, atol=0.01)
+
+@pytest.mark.parametrize("overrides", [
+    {"nope": 1},
+    {"experience": -1},
+    {"experience": float("nan")},
+    {"experience": float("inf")},
+    {"experience": float("-inf")},
+    dict.fromkeys(scoring.DEFAULT_WEIGHTS, 0),
+])
+def test_invalid_profiles_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        scoring.resolve_weights(overrides)
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import insert
+from app.database import Base, SessionLocal, engine
+from app.models.resume import Resume
+from app.models.resume_skill import ResumeSkill
+from app.services import feature_store, skill_index
+
+Base.metadata.create_all(bind=engine)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def _resume(db, skills):
+    resume = Resume(filename="cv.txt", file_path="memory", resume_text=" ".join(skills or []))
+    if skills is not None:
+        feature_store.store_features(resume, {"skills": skills, "years_exp": 0.0, "education_level": 0})
+    db.add(resume)
+    db.commit()
+    return resume.id
+
+def _search(index, db, query):
+    index.sync(db)
+    node = skill_index.parse_query(query)
+    total, results = index.search(node, skill_index.query_skills(node), 1000)
+    return {r["resume_id"] for r in results}
+
+def test_uploads_are_searchable(db):
+    index = skill_index.SkillIndex()
+    both = _resume(db, ["python", "sql"])
+    only_python = _resume(db, ["python"])
+    assert {both, only_python} <= _search(index, db, "python")
+    assert both in _search(index, db, "python AND sql")
+    assert only_python not in _search(index, db, "python AND sql")
+    # Caught up after the first load
+    later = _resume(db, ["sql"])
+    assert later in _search(index, db, "sql")
+
+def test_rows_committed_below_the_applied_seq_are_picked_up(db):
+    index = skill_index.SkillIndex()
+    early = _resume(db, None) # a slow upload: id and seq taken first, committed last
+    late = _resume(db, ["java"])
+    assert late in _search(index, db, "java")
+
+    max_seq = max(seq for (seq,) in db.query(ResumeSkill.seq))
+    db.execute(insert(ResumeSkill), [{"seq": max_seq - 1000, "skill": "java", "resume_id": early}])
+    db.commit()
+    assert early in _search(index, db, "java")
+
+def test_re_extracted_features_replace_the_postings(db):
+    index = skill_index.SkillIndex()
+    resume_id = _resume(db, ["python"])
+    assert resume_id in _search(index, db, "python")
+
+    resume = db.get(Resume, resume_id)
+    feature_store.store_features(resume, {"skills": ["java"], "years_exp": 0.0, "education_level": 0})
+    db.commit()
+    assert resume_id not in _search(index, db, "python")
+    assert resume_id in _search(index, db, "java")
+
+    feature_store.store_features(resume, {"skills": [], "years_exp": 0.0, "education_level": 0})
+    db.commit()
+    assert resume_id not in _search(index, db, "java OR python OR sql")
+
+def test_rebuild_matches_cached_features(db):
+    resume_id = _resume(db, ["sql", "java"])
+    skill_index.rebuild_postings()
+    rows = {skill for (skill,) in db.query(ResumeSkill.skill).filter(ResumeSkill.resume_id == resume_id)}
+    assert rows == {"sql", "java"}
+    assert resume_id in _search(skill_index.SkillIndex(), db, "sql AND java")
+
+@pytest.mark.parametrize("query, parsed", [
+    ("python AND (java OR sql)", "python AND (java OR sql)"),
+    ("Python and java or sql", "(python AND java) OR sql"),
+    ('"sql"', "sql"),
+])
+def test_parse_query(query, parsed):
+    assert skill_index.format_query(skill_index.parse_query(query)) == parsed
+
+@pytest.mark.parametrize("query", ["", "python AND", "(python", "python)", "cobolx", "AND java"])
+def test_malformed_queries_raise(query):
+    with pytest.raises(ValueError):
+        skill_index.parse_query(query)
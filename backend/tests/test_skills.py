@@ -0,0 +1,57 @@
+import random
+import re
+import pytest
+from app.utils import skills
+
+SKILLS = {
+    "python", "java", "javascript", "c", "c++", "c#", ".net", "asp.net", "node.js", "go", "r",
+    "sql", "machine learning", "deep learning", "power bi", "natural language processing",
+    "data science", "artificial intelligence", "google cloud platform", "cloud", "a  b",
+}
+
+def regex_loop_skills(text):
+    """extract_skills before the trie: one regex search per known skill."""
+    normalized_text = re.sub(r'[^a-z0-9+#.]', ' ', text.lower())
+    found = set()
+    for token in set(normalized_text.split()):
+        if skills.SYNONYM_MAP.get(token) in SKILLS:
+            found.add(skills.SYNONYM_MAP[token])
+    for skill in SKILLS:
+        if re.search(r'(?:^|\s)' + re.escape(skill) + r'(?:$|\s)', normalized_text):
+            found.add(skill)
+    return found
+
+@pytest.fixture(autouse=True)
+def skill_trie(monkeypatch):
+    monkeypatch.setattr(skills, "SKILL_TRIE", skills.build_skill_trie(SKILLS, skills.SYNONYM_MAP))
+
+@pytest.mark.parametrize("text", [
+    "Python, Java and SQL",
+    "C++ / C# / .NET developer; ASP.NET MVC",
+    "c++11 and c#-based tools, dotnet, .net.",
+    "Node.js and JavaScript (ES6)",
+    "Go developer. Good at going places",
+    "R, C and C++",
+    "Machine learning and deep-learning; machine  learning with two spaces",
+    "Power BI dashboards; powerbi; BI",
+    "ML, DL, NLP, JS, AI and DS experience",
+    "Natural Language Processing on Google Cloud Platform",
+    "google cloud, cloud platform",
+    "a  b and a b",
+    "MACHINE\tLEARNING\nPYTHON",
+    "python",
+    "",
+])
+def test_trie_matches_the_regex_loop(text):
+    assert set(skills.extract_skills(text)) == regex_loop_skills(text)
+
+def test_synonyms_only_expand_to_known_skills():
+    # "be" -> "backend" is not in SKILLS
+    assert skills.extract_skills("ML engineers should be curious") == ["machine learning"]
+
+def test_trie_matches_the_regex_loop_on_random_text():
+    rng = random.Random(3)
+    vocab = sorted(SKILLS) + sorted(skills.SYNONYM_MAP) + ["and", "with", "C++.", "(.NET)", "go,", "  ", "\n", "-"]
+    for _ in range(300):
+        text = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 40)))
+        assert set(skills.extract_skills(text)) == regex_loop_skills(text), text
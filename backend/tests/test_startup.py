@@ -0,0 +1,15 @@
+import os
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.services import corpus_model, job_queue
+
+def test_corpus_model_is_built_at_startup(monkeypatch):
+    monkeypatch.setattr(job_queue, "start_workers", lambda: None)
+    monkeypatch.setattr(corpus_model, "_model", None)
+    if os.path.exists(settings.CORPUS_MODEL_PATH):
+        os.remove(settings.CORPUS_MODEL_PATH)
+
+    with TestClient(app):
+        assert corpus_model._model is not None
+        assert os.path.exists(settings.CORPUS_MODEL_PATH)
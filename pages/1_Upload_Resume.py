@@ -3,21 +3,51 @@ from utils import api_client
 
 st.title("📤 Upload Resume")
 
-uploaded_file = st.file_uploader("Choose a PDF or DOCX file", type=["pdf", "docx", "txt"])
+mode = st.radio("Upload", ["Single resume", "Multiple resumes / zip"], horizontal=True)
 
-if uploaded_file is not None:
-    if st.button("Upload & Process"):
-        with st.spinner("Uploading and extracting text..."):
-            result = api_client.upload_resume(uploaded_file)
-            
-        if result:
-            st.success(f"Resume uploaded successfully! ID: {result['id']}")
-            st.json(result)
-        else:
-            st.error("Failed to upload resume. Please check backend connection.")
+if mode == "Single resume":
+    uploaded_file = st.file_uploader("Choose a PDF or DOCX file", type=["pdf", "docx", "txt"])
+    
+    if uploaded_file is not None:
+        if st.button("Upload & Process"):
+            with st.spinner("Uploading and extracting text..."):
+                result = api_client.upload_resume(uploaded_file)
+                
+            if result:
+                st.success(f"Resume uploaded successfully! ID: {result['id']}")
+                st.json(result)
+            else:
+                st.error("Failed to upload resume. Please check backend connection.")
+else:
+    uploaded_files = st.file_uploader(
+        "Choose PDF, DOCX or TXT files, or zip archives of them",
+        type=["pdf", "docx", "txt", "zip"],
+        accept_multiple_files=True
+    )
+    
+    if uploaded_files:
+        if st.button("Upload & Process All"):
+            with st.spinner(f"Uploading and extracting {len(uploaded_files)} file(s)..."):
+                results = api_client.bulk_upload_resumes(uploaded_files)
+                
+            if results is None:
+                st.error("Bulk upload failed. Please check backend connection.")
+            else:
+                created = [r for r in results if r["status"] == "created"]
+                duplicates = [r for r in results if r["status"] == "duplicate"]
+                failed = [r for r in results if r["status"] == "failed"]
+                st.success(f"Uploaded {len(created)} of {len(results)} resume(s).")
+                if duplicates:
+                    st.info(f"{len(duplicates)} file(s) were already stored and were skipped.")
+                    st.dataframe([{"filename": r["filename"], "existing id": r["id"]} for r in duplicates])
+                if failed:
+                    st.warning(f"{len(failed)} file(s) could not be processed.")
+                    st.dataframe([{"filename": r["filename"], "error": r["error"]} for r in failed])
+                if created:
+                    st.dataframe(created)
 
 st.subheader("Recent Uploads")
-resumes = api_client.get_resumes()
+resumes = api_client.get_resumes(limit=50)
 if resumes:
     st.table(resumes)
 else:
@@ -4,6 +4,9 @@ import time
 
 st.title("📊 ATS Analysis Report")
 
+LLM_POLL_INTERVAL = 2 # seconds
+LLM_POLL_TIMEOUT = 300 # seconds
+
 # Fetch Data
 resumes = api_client.get_resumes()
 # Assuming we can get JDs too, or just user input ID. For now let's input ID or Mock List.
@@ -23,7 +26,7 @@ if st.button("Run Analysis"):
     else:
         resume_id = resume_options[selected_resume_name]
         
-        with st.spinner("Running deep analysis... This may take a few seconds (or more with LLM)."):
+        with st.spinner("Running deep analysis..."):
             data = api_client.run_analysis(resume_id, jd_id, use_llm)
             
         if "detail" in data:
@@ -59,6 +62,29 @@ if st.button("Run Analysis"):
                 st.divider()
                 st.subheader("🤖 LLM Suggestions")
                 
+                # LLM work runs as a background job; poll until it settles
+                job_id = data.get("job_id")
+                llm_summary = None
+                if job_id:
+                    job = None
+                    with st.spinner("Generating LLM suggestions... This may take a minute."):
+                        deadline = time.time() + LLM_POLL_TIMEOUT
+                        while time.time() < deadline:
+                            job = api_client.get_analysis_job(job_id)
+                            if job and job["status"] in ("done", "failed"):
+                                break
+                            time.sleep(LLM_POLL_INTERVAL)
+                    
+                    if not job or job["status"] not in ("done", "failed"):
+                        st.warning(f"LLM suggestions are still being generated (job {job_id}). Re-run later to see them.")
+                    elif job["status"] == "failed":
+                        st.error(f"LLM generation failed: {job.get('error')}")
+                    else:
+                        if job.get("error"):
+                            st.warning(f"Some LLM steps failed: {job['error']}")
+                        data = job.get("analysis") or data
+                        llm_summary = (job.get("result") or {}).get("summary")
+                
                 tab1, tab2, tab3 = st.tabs(["Rewritten Bullets", "Optimized Summary", "Draft Resume"])
                 
                 with tab1:
@@ -72,10 +98,11 @@ if st.button("Run Analysis"):
                         st.info("No rewritten bullets available.")
                         
                 with tab2:
-                    # Note: We didn't explicitly return summary in analysis response schema separate from generated_resume_text
-                    # But if we did partial LLM calls (e.g. just summary) it would appear.
-                    # The full resume generation includes summary.
-                    st.info("Check the full draft resume for the new summary.")
+                    # The summary is generated alongside the bullets and draft and kept on the job result
+                    if llm_summary:
+                        st.write(llm_summary)
+                    else:
+                        st.info("Check the full draft resume for the new summary.")
                     
                 with tab3:
                     draft_text = data.get('generated_resume_text')
@@ -1,47 +1,178 @@
+import time
 import streamlit as st
 from utils import api_client
 
+BATCH_POLL_INTERVAL = 2 # Seconds between batch job status checks
+REWEIGHT_TOP_K = 100 # Candidates shown while sliding weights
+SEARCH_TOP_K = 200 # Skill search matches offered for ranking
+
 st.title("👥 Recruiter Mode: Ranking")
 
+def show_results(results):
+    st.subheader("🏆 Candidate Rankings")
+    
+    # Display as dataframe for cleaner sortable view
+    # Prepare data
+    display_data = []
+    for res in results:
+        display_data.append({
+            "Rank": res['rank_position'],
+            "Score": res['ats_score'],
+            "Filename": res['filename'],
+            "Matched Skills": len(res['matched_skills']),
+            "Missing Skills": len(res['missing_skills']),
+            "Years Exp": res['years_exp']
+        })
+    
+    st.dataframe(display_data)
+    
+    st.subheader("Detailed Breakdown")
+    for res in results:
+        with st.expander(f"#{res['rank_position']} {res['filename']} (Score: {res['ats_score']})"):
+            st.write(f"Matched: {', '.join(res['matched_skills'])}")
+            st.write(f"Missing: {', '.join(res['missing_skills'])}")
+
+def show_reweight(jd_id):
+    st.subheader("⚖️ Re-weight Ranking")
+    st.caption("Slide the weights to re-rank the candidates ranked for this JD from their stored sub-scores.")
+    
+    defaults = api_client.get_jd_weights(jd_id)
+    if not defaults:
+        st.error("Could not load the JD's weights.")
+        return
+    
+    weights = {}
+    for col, (name, value) in zip(st.columns(len(defaults)), defaults.items()):
+        weights[name] = col.slider(
+            name.replace("_", " ").title(), 0.0, 1.0, float(value), 0.05, key=f"weight_{jd_id}_{name}"
+        )
+    
+    results = api_client.reweight_ranking(jd_id, weights, top_k=REWEIGHT_TOP_K)
+    if isinstance(results, dict):
+        st.warning(results["detail"])
+        return
+    
+    st.dataframe([
+        {
+            "Rank": res["rank_position"],
+            "Score": res["ats_score"],
+            "Filename": res["filename"],
+            **{name.replace("_", " ").title(): value for name, value in res["scores"].items()}
+        }
+        for res in results
+    ])
+    
+    if st.button("Save as this JD's weights"):
+        if api_client.set_jd_weights(jd_id, weights):
+            st.success("Weights saved; future analyses and rankings for this JD use them.")
+        else:
+            st.error("Saving weights failed.")
+
 jd_id = st.number_input("Enter Job Description ID", min_value=1, step=1)
-resumes = api_client.get_resumes()
+mode = st.radio("Candidates", ["Selected candidates", "Entire resume pool"], horizontal=True)
 
-if not resumes:
-    st.error("No resumes found in database.")
+if mode == "Entire resume pool":
+    top_k = st.number_input("Show top K", min_value=1, max_value=1000, value=50, step=10)
+    
+    if st.button("Rank Pool"):
+        progress = st.progress(0.0, text="Scoring resume pool...")
+        total = 0
+        results = []
+        for event in api_client.rank_candidates_stream(jd_id, top_k):
+            if event["type"] == "start":
+                total = event["total"]
+            elif event["type"] == "progress" and total:
+                progress.progress(event["scored"] / total, text=f"Scored {event['scored']} / {total} resumes")
+            elif event["type"] == "result":
+                results.append(event)
+        progress.empty()
+        
+        if results:
+            show_results(results)
+        else:
+            st.error("Ranking failed or no data returned.")
 else:
-    options = {r['filename']: r['id'] for r in resumes}
-    selected_resumes = st.multiselect("Select Candidates to Rank", list(options.keys()))
+    skill_query = st.text_input("Find candidates by skills (optional)", placeholder="kubernetes AND go AND (aws OR gcp)")
+    
+    if skill_query:
+        found = api_client.search_resumes(skill_query, jd_id=jd_id, top_k=SEARCH_TOP_K)
+        if "detail" in found:
+            st.warning(found["detail"])
+            resumes = []
+        else:
+            st.caption(f"{found['total']} resumes match {found['query']}; best {len(found['results'])} by skill match listed.")
+            resumes = [{"id": r["resume_id"], "filename": r["filename"]} for r in found["results"]]
+    else:
+        resumes = api_client.get_resumes()
+    
+    if not resumes:
+        st.error("No matching resumes." if skill_query else "No resumes found in database.")
+    else:
+        options = {r['filename']: r['id'] for r in resumes}
+        selected_resumes = st.multiselect(
+            "Select Candidates to Rank", list(options.keys()),
+            default=list(options.keys()) if skill_query else None
+        )
+        
+        if st.button("Rank Candidates"):
+            if not selected_resumes:
+                st.warning("Select at least one candidate.")
+            else:
+                resume_ids = [options[name] for name in selected_resumes]
+                with st.spinner("Ranking..."):
+                    results = api_client.rank_candidates(jd_id, resume_ids)
+                    
+                if results:
+                    st.session_state["ranked_jd_id"] = jd_id
+                    show_results(results)
+                else:
+                    st.error("Ranking failed or no data returned.")
+        
+        # Sliders rerun the page, so re-weighting stays available after ranking
+        if st.session_state.get("ranked_jd_id") == jd_id:
+            st.divider()
+            show_reweight(jd_id)
+
+st.divider()
+st.subheader("✍️ Batch Bullet Rewrite")
+st.caption("Generate JD-optimized bullets for several candidates at once.")
+
+batch_resumes = api_client.get_resumes()
+if batch_resumes:
+    batch_options = {r['filename']: r['id'] for r in batch_resumes}
+    batch_selected = st.multiselect("Candidates to rewrite", list(batch_options.keys()), key="batch_rewrite_resumes")
     
-    if st.button("Rank Candidates"):
-        if not selected_resumes:
+    if st.button("Generate Optimized Bullets"):
+        if not batch_selected:
             st.warning("Select at least one candidate.")
         else:
-            resume_ids = [options[name] for name in selected_resumes]
-            with st.spinner("Ranking..."):
-                results = api_client.rank_candidates(jd_id, resume_ids)
-                
-            if results:
-                st.subheader("🏆 Candidate Rankings")
-                
-                # Display as dataframe for cleaner sortable view
-                # Prepare data
-                display_data = []
-                for res in results:
-                    display_data.append({
-                        "Rank": res['rank_position'],
-                        "Score": res['ats_score'],
-                        "Filename": res['filename'],
-                        "Matched Skills": len(res['matched_skills']),
-                        "Missing Skills": len(res['missing_skills']),
-                        "Years Exp": res['years_exp']
-                    })
-                
-                st.dataframe(display_data)
-                
-                st.subheader("Detailed Breakdown")
-                for res in results:
-                    with st.expander(f"#{res['rank_position']} {res['filename']} (Score: {res['ats_score']})"):
-                        st.write(f"Matched: {', '.join(res['matched_skills'])}")
-                        st.write(f"Missing: {', '.join(res['missing_skills'])}")
+            job = api_client.batch_rewrite(jd_id, [batch_options[name] for name in batch_selected])
+            if "id" not in job:
+                st.error(f"Batch rewrite failed: {job.get('detail')}")
             else:
-                st.error("Ranking failed or no data returned.")
+                progress = st.progress(0.0, text="Queued...")
+                while job and job["status"] in ("queued", "running"):
+                    time.sleep(BATCH_POLL_INTERVAL)
+                    job = api_client.get_analysis_job(job["id"])
+                    result = (job or {}).get("result") or {}
+                    if result.get("total"):
+                        progress.progress(
+                            result["completed"] / result["total"],
+                            text=f"Rewritten {result['completed']} / {result['total']} resumes"
+                        )
+                progress.empty()
+                
+                if not job or job["status"] == "failed":
+                    st.error(f"Batch rewrite failed: {(job or {}).get('error')}")
+                else:
+                    for item in job["result"]["results"]:
+                        with st.expander(item["filename"]):
+                            if item["error"]:
+                                st.error(item["error"])
+                            elif item["optimized_bullets"]:
+                                for bullet in item["optimized_bullets"]:
+                                    st.markdown(f"**Original:** {bullet.get('original')}")
+                                    st.markdown(f"**Optimized:** {bullet.get('rewritten')}")
+                                    st.caption(bullet.get('reasoning', ''))
+                            else:
+                                st.write(item["content"])
@@ -1,5 +1,6 @@
 import requests
 import os
+import json
 from typing import Optional, Dict, Any
 
 # Load from env or default
@@ -7,13 +8,45 @@ from typing import Optional, Dict, Any
 # For unified deployment on Streamlit Cloud, we should default to localhost:8000
 BACKEND_URL = os.getenv("BACKEND_URL", "http://127.0.0.1:8000")
 
-def get_resumes():
+RESUMES_PAGE_SIZE = 1000 # Largest page GET /resumes/ serves
+
+def get_resumes(limit: Optional[int] = None):
+    """
+    Resumes (id, filename, created_at), newest first: every stored resume,
+    or the newest `limit`. Follows the X-Next-After-Id header page by page.
+    """
+    resumes = []
+    params = {}
     try:
-        resp = requests.get(f"{BACKEND_URL}/resumes/")
-        return resp.json() if resp.status_code == 200 else []
+        while limit is None or len(resumes) < limit:
+            params["limit"] = RESUMES_PAGE_SIZE if limit is None else min(RESUMES_PAGE_SIZE, limit - len(resumes))
+            resp = requests.get(f"{BACKEND_URL}/resumes/", params=params)
+            if resp.status_code != 200:
+                break
+            resumes.extend(resp.json())
+            next_after_id = resp.headers.get("X-Next-After-Id")
+            if not next_after_id:
+                break
+            params["after_id"] = next_after_id
     except Exception as e:
         print(f"Error fetching resumes: {e}")
-        return []
+    return resumes
+
+def search_resumes(query: str, jd_id: Optional[int] = None, top_k: int = 200):
+    """
+    Resumes matching a boolean skill query ("kubernetes AND (aws OR gcp)"),
+    best skill match first. Returns the response dict, or {"detail": ...}.
+    """
+    try:
+        params = {"q": query, "top_k": top_k}
+        if jd_id is not None:
+            params["jd_id"] = jd_id
+        resp = requests.get(f"{BACKEND_URL}/resumes/search", params=params)
+        if resp.status_code == 200:
+            return resp.json()
+        return {"detail": resp.json().get("detail", resp.text)}
+    except Exception as e:
+        return {"detail": str(e)}
 
 def upload_resume(file_obj):
     try:
@@ -31,6 +64,26 @@ def upload_resume(file_obj):
         print(f"Exception during upload: {e}")
         return None
 
+def bulk_upload_resumes(file_objs: list):
+    """
+    Uploads many resumes (and/or zip archives of resumes) in one request.
+    Returns the per-file status list, or None if the request failed.
+    """
+    try:
+        files = []
+        for file_obj in file_objs:
+            file_obj.seek(0)
+            files.append(("files", (file_obj.name, file_obj, file_obj.type)))
+        resp = requests.post(f"{BACKEND_URL}/resumes/bulk_upload", files=files)
+        
+        if resp.status_code != 200:
+            print(f"Bulk upload failed: {resp.status_code} - {resp.text}")
+            
+        return resp.json() if resp.status_code == 200 else None
+    except Exception as e:
+        print(f"Exception during bulk upload: {e}")
+        return None
+
 def create_jd(role: str, jd_text: str):
     try:
         payload = {"role": role, "jd_text": jd_text}
@@ -58,6 +111,24 @@ def run_analysis(resume_id: int, jd_id: int, use_llm: bool = False):
     except Exception as e:
         return {"detail": str(e)}
 
+def get_analysis_job(job_id: int):
+    try:
+        resp = requests.get(f"{BACKEND_URL}/analysis/jobs/{job_id}")
+        return resp.json() if resp.status_code == 200 else None
+    except:
+        return None
+
+def batch_rewrite(jd_id: int, resume_ids: list, target_role: str = None):
+    """Queues bullet rewrites for many resumes against one JD; returns the job."""
+    try:
+        payload = {"jd_id": jd_id, "resume_ids": resume_ids, "target_role": target_role}
+        resp = requests.post(f"{BACKEND_URL}/llm/batch_rewrite", json=payload)
+        if resp.status_code == 200:
+            return resp.json()
+        return {"detail": resp.text}
+    except Exception as e:
+        return {"detail": str(e)}
+
 def rank_candidates(jd_id: int, resume_ids: list):
     try:
         # Expected body format: {"resume_ids": [1, 2]} for Body(embed=True)
@@ -66,6 +137,58 @@ def rank_candidates(jd_id: int, resume_ids: list):
     except:
         return []
 
+def reweight_ranking(jd_id: int, weights: dict, top_k: int = 50):
+    """
+    Re-ranks the candidates last ranked for a JD with new weights, from
+    their stored sub-scores. Returns the ranked list, or {"detail": ...}.
+    """
+    try:
+        resp = requests.post(
+            f"{BACKEND_URL}/rank/jd/{jd_id}/reweight",
+            json={"weights": weights, "top_k": top_k}
+        )
+        if resp.status_code == 200:
+            return resp.json()
+        return {"detail": resp.json().get("detail", resp.text)}
+    except Exception as e:
+        return {"detail": str(e)}
+
+def get_jd_weights(jd_id: int):
+    """Effective scorer weights for a JD (scorer name -> weight)."""
+    try:
+        resp = requests.get(f"{BACKEND_URL}/jds/{jd_id}/weights")
+        return resp.json()["weights"] if resp.status_code == 200 else None
+    except:
+        return None
+
+def set_jd_weights(jd_id: int, weights: dict):
+    """Saves a JD's weight profile; returns the effective weights or None."""
+    try:
+        resp = requests.put(f"{BACKEND_URL}/jds/{jd_id}/weights", json={"weights": weights})
+        return resp.json()["weights"] if resp.status_code == 200 else None
+    except:
+        return None
+
+def rank_candidates_stream(jd_id: int, top_k: int = 50):
+    """
+    Ranks the whole resume pool against a JD. Yields the NDJSON events
+    (start / progress / result / done) as the backend streams them.
+    """
+    try:
+        with requests.get(
+            f"{BACKEND_URL}/rank/jd/{jd_id}/stream",
+            params={"top_k": top_k},
+            stream=True
+        ) as resp:
+            if resp.status_code != 200:
+                print(f"Pool ranking failed: {resp.status_code} - {resp.text}")
+                return
+            for line in resp.iter_lines():
+                if line:
+                    yield json.loads(line)
+    except Exception as e:
+        print(f"Error streaming ranking: {e}")
+
 def get_report_pdf(analysis_id: int):
     try:
         resp = requests.get(f"{BACKEND_URL}/reports/{analysis_id}/pdf")